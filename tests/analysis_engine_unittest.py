@@ -3,36 +3,51 @@ import numpy as np
 import soundfile as sf
 import os
 import sys
+import tempfile
+from unittest import mock
 
 # Path Hack to allow importing from the parent directory
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from vslm.analysis_engine import StreamProcessor
 from vslm.constants import Weighting
+from signal_gen import gen_tone
+
+# Designs are rebuilt on every test run: nothing is read from or written to
+# the developer's ~/.vslm_cache, where a stale entry could mask a regression
+_NO_DISK_CACHE = mock.patch.dict(os.environ, {'VSLM_CACHE_DIR': ''})
+
+def setUpModule():
+    _NO_DISK_CACHE.start()
+
+def tearDownModule():
+    _NO_DISK_CACHE.stop()
 
 class TestAnalysisEngine(unittest.TestCase):
     
-    def setUp(self):
-        # Create a temporary test WAV file (1 second, 1kHz tone, 48kHz)
-        self.test_file = 'temp_engine_test.wav'
-        self.fs = 48000
-        self.duration = 1.0
-        
-        t = np.linspace(0, self.duration, int(self.fs * self.duration), endpoint=False)
+    @classmethod
+    def setUpClass(cls):
+        # Create one temporary test WAV file (1 second, 1kHz tone, 48kHz) shared by all tests
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
+            cls.test_file = tmp.name
+        cls.fs = 48000
+        cls.duration = 1.0
         
         # Generate signal with RMS = 0.5 (Peak ~= 0.707)
         # This fits safely within [-1.0, 1.0] to avoid clipping in the WAV file.
         # We will use cal_factor=2.0 later to simulate a 1.0 Pascal signal.
-        self.signal_rms = 0.5
-        self.signal = np.sqrt(2) * self.signal_rms * np.sin(2 * np.pi * 1000 * t)
+        cls.signal_rms = 0.5
+        cls.signal = gen_tone(cls.fs, 1000.0, int(cls.fs * cls.duration),
+                              np.sqrt(2) * cls.signal_rms)
         
-        sf.write(self.test_file, self.signal, self.fs)
+        sf.write(cls.test_file, cls.signal, cls.fs)
 
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         # Consume generator fully or use try/except to ensure file release
-        if os.path.exists(self.test_file):
+        if os.path.exists(cls.test_file):
             try:
-                os.remove(self.test_file)
+                os.remove(cls.test_file)
             except PermissionError:
                 pass # File might still be locked if test crashed hard
 
@@ -89,5 +104,58 @@ class TestAnalysisEngine(unittest.TestCase):
         print(f"  500Hz Band Level: {levels[idx_500]:.2f} dB")
         self.assertLess(levels[idx_500], 20.0, "Leakage into 500Hz band should be negligible")
 
+    def test_run_analysis_raw_power(self):
+        print("\n--- Testing Analysis Engine: Linear Power Output ---")
+        
+        kwargs = dict(block_size_ms=100, weighting=Weighting.A, do_band_analysis=True)
+        db = list(StreamProcessor(self.test_file, cal_factor=2.0).run_analysis(**kwargs))
+        lin = list(StreamProcessor(self.test_file, cal_factor=2.0).run_analysis(raw_power=True, **kwargs))
+        
+        self.assertEqual(len(lin), len(db))
+        self.assertNotIn('leq', lin[5])
+        
+        # Same blocks, just without the log10
+        for key in ('leq', 'lp', 'bands'):
+            got = np.array([10 * np.log10(r[key + '_lin'] + 1e-30) for r in lin])
+            want = np.array([r[key] for r in db])
+            np.testing.assert_allclose(got, want, atol=1e-9)
+
+    def test_run_analysis_batched(self):
+        print("\n--- Testing Analysis Engine: Batched Columns ---")
+        
+        kwargs = dict(block_size_ms=100, weighting=Weighting.A, do_band_analysis=True)
+        processor = StreamProcessor(self.test_file, cal_factor=2.0)
+        blocks = list(processor.run_analysis(**kwargs))
+        batches = list(processor.run_analysis_batched(batch=4, **kwargs))
+        
+        # 10 blocks in batches of 4, 4, 2
+        self.assertEqual([len(b['time']) for b in batches], [4, 4, 2])
+        self.assertEqual(processor.n_blocks(100), len(blocks))
+        
+        for key in ('time', 'leq', 'lp', 'bands'):
+            got = np.concatenate([b[key] for b in batches])
+            np.testing.assert_array_equal(got, np.array([r[key] for r in blocks]))
+        np.testing.assert_array_equal(batches[0]['band_freqs'], blocks[0]['band_freqs'])
+
+    def test_float32_pipeline(self):
+        print("\n--- Testing Analysis Engine: float32 Samples ---")
+
+        processor = StreamProcessor(self.test_file, cal_factor=2.0)
+
+        # Samples are decoded and calibrated as float32; the block mean squares
+        # still match a float64 reading of the file to float32 precision
+        batch, = processor.run_analysis_batched(block_size_ms=100, weighting=Weighting.Z, raw_power=True)
+        data, _ = sf.read(self.test_file, dtype='float64')
+        want = np.mean((2.0 * data).reshape(10, -1)**2, axis=1) / (20e-6)**2
+        np.testing.assert_allclose(batch['leq_lin'], want, rtol=1e-5)
+
+        # The spectra stay float32, and the PSD still peaks at the tone
+        kind, psd = list(processor.calculate_psd(nfft=4096, weighting=Weighting.Z))[-1]
+        self.assertEqual(psd['pxx'].dtype, np.float32)
+        df = psd['freqs'][1] - psd['freqs'][0]
+        self.assertAlmostEqual(psd['freqs'][np.argmax(psd['pxx'])], 1000.0, delta=df)
+        kind, spec = list(processor.calculate_spectrogram(nfft=512, dt=0.1, weighting=Weighting.Z))[-1]
+        self.assertEqual(spec['pxx_matrix'].dtype, np.float32)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
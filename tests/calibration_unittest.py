@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+import soundfile as sf
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Path Hack to allow importing from the parent directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from vslm.calibration import compute_selection_rms, calculate_factor_from_ref
+
+class TestSelectionRms(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # 3 s of 3-channel noise, long enough to span several read blocks
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
+            cls.test_file = Path(tmp.name)
+        cls.fs = 48000
+        rng = np.random.default_rng(7)
+        cls.signal = 0.2 * rng.standard_normal((3 * cls.fs, 3))
+        sf.write(cls.test_file, cls.signal, cls.fs, subtype='FLOAT')
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.test_file.exists():
+            cls.test_file.unlink()
+
+    def test_matches_direct_rms(self):
+        print("\n--- Testing Calibration: Selection RMS ---")
+        for start, end in ((0.0, 3.0), (0.25, 2.6), (1.0, 1.01)):
+            got = compute_selection_rms(self.test_file, start, end)
+            
+            # Straightforward reference: read the selection, mix down, RMS
+            data, _ = sf.read(self.test_file, start=int(start * self.fs), stop=int(end * self.fs))
+            want = np.sqrt(np.mean(np.mean(data, axis=1)**2))
+            self.assertAlmostEqual(got, want, delta=want * 1e-6)
+
+    def test_invalid_selection(self):
+        print("\n--- Testing Calibration: Invalid Selections ---")
+        with self.assertRaises(ValueError):
+            compute_selection_rms(self.test_file, 1.0, 1.0)
+        # Starts at the end of the file, so no frames are read
+        with self.assertRaises(ValueError):
+            compute_selection_rms(self.test_file, 3.0, 4.0)
+        with self.assertRaises(FileNotFoundError):
+            compute_selection_rms(self.test_file.with_name("missing.wav"), 0.0, 1.0)
+
+    def test_factor_from_ref(self):
+        # 94 dB is 1 Pa; a measured RMS of 0.5 then needs a factor of 2
+        self.assertAlmostEqual(calculate_factor_from_ref(0.5, 20 * np.log10(1.0 / 20e-6)), 2.0, places=9)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+import csv
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Path Hack to allow importing from the parent directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from vslm.controller import VSLMController
+from vslm.settings_manager import AppSettings
+from vslm.constants import LeqInterval
+
+class TestControllerExport(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = VSLMController()
+        # Defaults, not whatever settings file the user has saved
+        self.controller.settings = AppSettings()
+        self.errors = []
+        self.controller.sig_analysis_error.connect(self.errors.append)
+
+    def test_export_leq(self):
+        print("\n--- Testing Controller: LEQ Export ---")
+        # 10 s of 100 ms blocks at 94 dB, as the worker hands them over
+        n_blocks = 100
+        self.controller.settings.block_size_ms = 100
+        self.controller.last_results = {
+            'time': np.arange(n_blocks) * 0.1,
+            'leq': np.full(n_blocks, 94.0, dtype=np.float32),
+            'lp': np.full(n_blocks, 94.0, dtype=np.float32),
+        }
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "leq.csv"
+            self.controller.export_results(path, 1, LeqInterval.SEC_1)
+            self.assertEqual(self.errors, [])
+            with open(path, newline='') as f:
+                rows = list(csv.reader(f))
+
+        # Two header rows, then one row per 1 s interval
+        self.assertEqual(len(rows), 2 + 10)
+        self.assertEqual(rows[2], ["0.00", "94.00"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import numpy as np
+
+# 20*log10(x) == _LOG10_SCALE * ln(x); folds the log base change into one multiply
+_LOG10_SCALE = 20.0 / np.log(10.0)
+
+# Approximate IEC 61672-1 Class 1 tolerances as a step table over frequency:
+# f < 25, f < 100, f <= 5000, f <= 16000, above. The inclusive upper edges sit
+# one ulp past 5000/16000 so a single right-sided searchsorted picks the row.
+_TOL_EDGES = np.array([25.0, 100.0, np.nextafter(5000.0, np.inf), np.nextafter(16000.0, np.inf)])
+_TOL_PLUS = np.array([2.5, 1.5, 1.1, 2.5, 3.0])
+_TOL_MINUS = np.array([-np.inf, -1.5, -1.1, -2.5, -5.0])
+
+def unit_circle(f, fs):
+    """
+    Returns z^-1 = exp(-j*2*pi*f/fs) for the frequencies f (Hz), the grid that
+    sos_response evaluates on. Compute once per (f, fs) and reuse it.
+    """
+    return np.exp(-2j * np.pi * np.asarray(f, dtype=float) / fs)
+
+def sos_response(sos_list, z):
+    """
+    Complex response of each SOS cascade in sos_list on the precomputed grid z
+    (see unit_circle). Each biquad is evaluated in Horner form,
+    (b0 + z*(b1 + z*b2)) / (a0 + z*(a1 + z*a2)), and the sections multiplied.
+    Equivalent to scipy.signal.sosfreqz(sos, worN=f, fs=fs)[1] per cascade.
+    """
+    h = []
+    for sos in sos_list:
+        b0, b1, b2, a0, a1, a2 = (sos[:, k, None] for k in range(6))
+        h.append(np.prod((b0 + z * (b1 + z * b2)) / (a0 + z * (a1 + z * a2)), axis=0))
+    return h
+
+def mag_db(h, floor=0.0):
+    """
+    Magnitude of the complex response h in dB, 20*log10(|h| + floor).
+    A small floor keeps deep stopband nulls finite on the plot.
+    """
+    return _LOG10_SCALE * np.log(np.abs(h) + floor)
+
+def class1_tolerance(freqs):
+    """
+    Approximate IEC 61672-1 Class 1 tolerance (dB) at each of freqs, as
+    (plus, minus); minus is signed (-inf where no lower limit applies).
+    """
+    row = np.searchsorted(_TOL_EDGES, freqs, side='right')
+    return _TOL_PLUS[row], _TOL_MINUS[row]
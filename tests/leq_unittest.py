@@ -6,7 +6,7 @@ import os
 # Path Hack to allow importing from the parent directory
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from vslm.leq_calculator import calculate_leq_analysis
+from vslm.leq_calculator import calculate_leq_analysis, energy_mean_db
 from vslm.settings_manager import DoseStandard
 
 class TestLeqAnalysis(unittest.TestCase):
@@ -28,15 +28,21 @@ class TestLeqAnalysis(unittest.TestCase):
         )
 
     def create_blocks(self, duration_s, level_db, block_ms=100):
-        """Helper to create a list of block results with constant level."""
+        """Helper to create columnar block results with constant level."""
         n_blocks = int(duration_s * 1000 / block_ms)
-        blocks = []
-        for i in range(n_blocks):
-            blocks.append({
-                'time': i * (block_ms/1000.0), 
-                'leq': level_db
-            })
-        return blocks
+        return {
+            'time': np.arange(n_blocks) * (block_ms/1000.0),
+            'leq': np.full(n_blocks, level_db)
+        }
+
+    def cat_blocks(self, *blocks, block_ms=100):
+        """Helper to join columnar block results, continuing the time base."""
+        dt = block_ms / 1000.0
+        starts = np.cumsum([0] + [len(b['time']) for b in blocks[:-1]]) * dt
+        return {
+            'time': np.concatenate([b['time'] + t0 for b, t0 in zip(blocks, starts)]),
+            'leq': np.concatenate([b['leq'] for b in blocks])
+        }
 
     def test_constant_level(self):
         print("\n--- Testing LEQ: Constant 94dB Signal ---")
@@ -67,7 +73,7 @@ class TestLeqAnalysis(unittest.TestCase):
         # 5 seconds of 80 dB, 5 seconds of 100 dB
         b1 = self.create_blocks(5.0, 80.0)
         b2 = self.create_blocks(5.0, 100.0)
-        blocks = b1 + b2 # Concatenate
+        blocks = self.cat_blocks(b1, b2) # Concatenate
         
         stats = calculate_leq_analysis(
             block_results=blocks, 
@@ -85,6 +91,22 @@ class TestLeqAnalysis(unittest.TestCase):
         self.assertEqual(stats.max, 100.0)
         self.assertEqual(stats.min, 80.0)
 
+        # The joined blocks keep one continuous time base, and the 1s history
+        # shows the step from 80 dB to 100 dB at the 5 s boundary
+        np.testing.assert_allclose(np.diff(blocks['time']), 0.1)
+        np.testing.assert_allclose(stats.history['leq'], [80.0] * 5 + [100.0] * 5)
+
+    def test_energy_mean_per_band(self):
+        print("\n--- Testing LEQ: Energy Mean Per Band ---")
+        # Blocks x bands, as the band spectrum export averages them
+        levels = np.array([[80.0, 60.0], [100.0, 60.0]], dtype=np.float32)
+        
+        expected = 10 * np.log10(np.mean(10**(levels.astype(float) / 10), axis=0))
+        np.testing.assert_allclose(energy_mean_db(levels, axis=0), expected, atol=1e-9)
+        
+        # The log-domain form stays finite where 10**(L/10) overflows float64
+        self.assertAlmostEqual(energy_mean_db(np.array([4000.0, 4000.0])), 4000.0, places=6)
+
     def test_dose_niosh(self):
         print("\n--- Testing Dose: NIOSH (85dB Criterion, 3dB Exchange) ---")
         # 1 Hour of 85 dB
@@ -152,7 +174,7 @@ class TestLeqAnalysis(unittest.TestCase):
         )
         
         hist_len = len(stats.history['leq'])
-        print(f"  Input Blocks: {len(blocks)}, Output Intervals: {hist_len}")
+        print(f"  Input Blocks: {len(blocks['leq'])}, Output Intervals: {hist_len}")
         
         # Should be exactly 10 intervals
         self.assertEqual(hist_len, 10)
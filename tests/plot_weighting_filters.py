@@ -1,8 +1,8 @@
 import sys
 import os
+import functools
 import numpy as np
 import matplotlib.pyplot as plt
-import scipy.signal
 
 # --- Path Setup ---
 # Ensure we can import from the 'vslm' package if this script is run from root or tests
@@ -16,80 +16,80 @@ elif os.path.exists(os.path.join(parent_dir, 'vslm')):
     sys.path.insert(0, parent_dir)
 
 # Correct Import for the new file structure
-from vslm.filters.weighting_filters import WeightingFilter, SUPPORTED_FS
+from vslm.filters.weighting_filters import WeightingFilter, SUPPORTED_FS, ISO_FREQS
+from freq_response import unit_circle, sos_response, mag_db, class1_tolerance
+
+# ANSI S1.42 pole frequencies (Hz)
+F1 = 20.598997
+F2 = 107.65265
+F3 = 737.86223
+F4 = 12194.217
+
+def _a_gain(f2):
+    """Unnormalized A-weighting magnitude for squared frequency f2."""
+    return (F4*F4) * (f2*f2) / (
+        (f2 + F1*F1) * np.sqrt((f2 + F2*F2) * (f2 + F3*F3)) * (f2 + F4*F4)
+    )
+
+def _c_gain(f2):
+    """Unnormalized C-weighting magnitude for squared frequency f2."""
+    return (F4*F4) * f2 / ((f2 + F1*F1) * (f2 + F4*F4))
+
+# Gains at 1 kHz in dB, subtracted to normalize the curves to 0dB there
+REF_A_DB = 20 * np.log10(_a_gain(1000.0 * 1000.0))
+REF_C_DB = 20 * np.log10(_c_gain(1000.0 * 1000.0))
 
 def get_ideal_weighting(freqs, type='A'):
     """
     Computes the theoretical ANSI S1.42 weighting curve (dB).
     """
-    f2 = freqs**2
-    f1 = 20.598997
-    f2_const = 107.65265
-    f3 = 737.86223
-    f4 = 12194.217
+    f2 = freqs * freqs
     
     if type == 'A':
-        num = (f4**2) * (f2**2)
-        den1 = (f2 + f1**2)
-        den2 = np.sqrt((f2 + f2_const**2) * (f2 + f3**2))
-        den3 = (f2 + f4**2)
-        gain = num / (den1 * den2 * den3)
-        
-        # Normalize to 0dB at 1kHz
-        ref_f = 1000.0
-        ref_val = ((f4**2) * (ref_f**4)) / (
-            ((ref_f**2) + f1**2) * np.sqrt(((ref_f**2) + f2_const**2) * ((ref_f**2) + f3**2)) * ((ref_f**2) + f4**2)
-        )
-        return 20 * np.log10(gain / ref_val)
+        return 20 * np.log10(_a_gain(f2)) - REF_A_DB
         
     elif type == 'C':
-        num = (f4**2) * f2
-        den = (f2 + f1**2) * (f2 + f4**2)
-        gain = num / den
-        
-        ref_f = 1000.0
-        ref_val = ((f4**2) * (ref_f**2)) / (((ref_f**2) + f1**2) * ((ref_f**2) + f4**2))
-        return 20 * np.log10(gain / ref_val)
+        return 20 * np.log10(_c_gain(f2)) - REF_C_DB
     
     return np.zeros_like(freqs)
 
+@functools.lru_cache(maxsize=None)
 def get_class1_tolerances(w_type='A'):
     """
     Returns Class 1 Tolerance Masks (approximate) for visualization.
+    The masks are the same for every call, so the arrays are shared read-only.
+    """
+    freqs = ISO_FREQS
+    plus, minus = class1_tolerance(freqs)
+    plus.setflags(write=False)
+    minus.setflags(write=False)
+    return freqs, plus, minus
+
+@functools.lru_cache(maxsize=None)
+def response_grid(fs):
     """
-    freqs = np.array([10, 12.5, 16, 20, 25, 31.5, 40, 50, 63, 80, 
-                      100, 125, 160, 200, 250, 315, 400, 500, 630, 800, 
-                      1000, 1250, 1600, 2000, 2500, 3150, 4000, 5000, 6300, 
-                      8000, 10000, 12500, 16000, 20000])
-    plus = []
-    minus = []
-    for f in freqs:
-        # Approximate IEC 61672-1 Class 1 tolerances
-        if f < 25:
-            p, m = 2.5, -np.inf 
-        elif f < 100:
-            p, m = 1.5, -1.5
-        elif f <= 5000:
-            p, m = 1.1, -1.1 
-        elif f <= 16000:
-            p, m = 2.5, -2.5
-        else:
-            p, m = 3.0, -5.0
-        plus.append(p)
-        minus.append(m)
-    return freqs, np.array(plus), np.array(minus)
+    Log grid over the valid range (10Hz to Nyquist) and its z^-1 values,
+    built once per rate and shared by the A and C plots.
+    ~1000 points is all a log axis can show.
+    """
+    f_grid = np.logspace(1, np.log10(fs/2), 1000)
+    return f_grid, unit_circle(f_grid, fs)
 
-def plot_weighting(w_type='A'):
+def plot_weighting(w_type='A', ax=None):
     """
     Plots the Ideal curve, Tolerance bands, and Actual Filter Response
     for all supported sampling rates.
+    Draws into ax when given (the caller shows the figure); otherwise opens
+    and shows a figure of its own.
     """
-    plt.figure(figsize=(12, 8))
+    own_figure = ax is None
+    if own_figure:
+        _, ax = plt.subplots(figsize=(12, 8))
     
     # 1. Ideal Curve
     f_ideal = np.logspace(1, 5.3, 1000) 
     ideal_db = get_ideal_weighting(f_ideal, w_type)
-    plt.semilogx(f_ideal, ideal_db, 'k--', linewidth=2, zorder=5, label=f'Ideal {w_type} (ANSI S1.42)')
+    ax.semilogx(f_ideal, ideal_db, 'k--', linewidth=2, zorder=5, label=f'Ideal {w_type} (ANSI S1.42)')
     
     # 2. Tolerance Bands
     tol_f, tol_plus, tol_minus = get_class1_tolerances(w_type)
@@ -99,7 +99,7 @@ def plot_weighting(w_type='A'):
     # Handle -inf for plotting
     lower_mask[lower_mask == -np.inf] = -200
     
-    plt.fill_between(tol_f, lower_mask, upper_mask, color='green', alpha=0.2, zorder=1, label='Class 1 Tolerance')
+    ax.fill_between(tol_f, lower_mask, upper_mask, color='green', alpha=0.2, zorder=1, label='Class 1 Tolerance')
     
     # 3. Dynamic SOS Filters for Supported Rates
     # Use a colormap to distinguish sampling rates
@@ -113,41 +113,46 @@ def plot_weighting(w_type='A'):
             # Access SOS coefficients
             sos = wf.sos
             
-            # Calculate frequency response
-            w, h = scipy.signal.sosfreqz(sos, worN=16384, fs=fs)
-            
-            mag_db = 20 * np.log10(np.abs(h) + 1e-15)
+            # Calculate frequency response on the shared grid for this rate
+            f_grid, z = response_grid(fs)
+            h, = sos_response([sos], z)
             
-            # Plot valid range (e.g. 10Hz to Nyquist)
-            mask = (w >= 10) & (w <= fs/2)
+            h_db = mag_db(h, 1e-15)
             
-            plt.semilogx(w[mask], mag_db[mask], 
-                         label=f'Fs={fs} Hz', 
-                         color=colors[i], linewidth=1.5, alpha=0.8, zorder=10)
+            ax.semilogx(f_grid, h_db, 
+                        label=f'Fs={fs} Hz', 
+                        color=colors[i], linewidth=1.5, alpha=0.8, zorder=10)
 
         except Exception as e:
             print(f"Skipping Fs={fs}Hz: {e}")
             continue
 
-    plt.title(f"{w_type}-Weighting Filter: MZT Hybrid SOS (Compliance Check)")
-    plt.xlabel("Frequency (Hz)")
-    plt.ylabel("Magnitude (dB)")
-    plt.grid(True, which='both', linestyle='--', alpha=0.5)
-    plt.legend(loc='lower center', ncol=4, fontsize='small')
-    plt.xlim(10, 100000) 
+    ax.set_title(f"{w_type}-Weighting Filter: MZT Hybrid SOS (Compliance Check)")
+    ax.set_xlabel("Frequency (Hz)")
+    ax.set_ylabel("Magnitude (dB)")
+    ax.grid(True, which='both', linestyle='--', alpha=0.5)
+    ax.legend(loc='lower center', ncol=4, fontsize='small')
+    ax.set_xlim(10, 100000) 
     
     # Set Y-Limits based on weighting type for better visibility
     if w_type == 'A':
-        plt.ylim(-80, 15) 
+        ax.set_ylim(-80, 15) 
     else:
-        plt.ylim(-20, 15)
-        
-    plt.tight_layout()
-    plt.show()
+        ax.set_ylim(-20, 15)
+    
+    if own_figure:
+        plt.tight_layout()
+        plt.show()
 
 if __name__ == "__main__":
+    # One figure for both weightings instead of a fresh figure per plot
+    fig, (ax_a, ax_c) = plt.subplots(1, 2, figsize=(20, 8))
+    
     print("Plotting A-Weighting...")
-    plot_weighting('A')
+    plot_weighting('A', ax=ax_a)
     
     print("Plotting C-Weighting...")
-    plot_weighting('C')
\ No newline at end of file
+    plot_weighting('C', ax=ax_c)
+    
+    fig.tight_layout()
+    plt.show()
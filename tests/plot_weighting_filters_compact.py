@@ -12,6 +12,7 @@ import os
 import scipy.signal as sg
 import numpy as np
 import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
 
 # --- Path Setup to import vslm ---
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -20,7 +21,8 @@ if os.path.exists(os.path.join(current_dir, 'vslm')):
 else:
     sys.path.insert(0, os.path.dirname(current_dir))
 
-from vslm.filters.weighting_filters import WeightingFilter, SUPPORTED_FS
+from vslm.filters.weighting_filters import WeightingFilter, SUPPORTED_FS, ISO_FREQS
+from freq_response import unit_circle, sos_response, mag_db, class1_tolerance
 
 # --- 1. Define Analog Prototypes (ANSI S1.42 Reference) ---
 
@@ -47,10 +49,7 @@ def get_tolerances():
     """
     Returns frequency arrays and tolerance masks.
     """
-    freqs = np.array([10, 12.5, 16, 20, 25, 31.5, 40, 50, 63, 80, 
-                      100, 125, 160, 200, 250, 315, 400, 500, 630, 800, 
-                      1000, 1250, 1600, 2000, 2500, 3150, 4000, 5000, 6300, 
-                      8000, 10000, 12500, 16000, 20000])
+    freqs = ISO_FREQS
 
     # --- ANSI S1.4 Type 0 (Laboratory Reference) ---
     up0 = np.array([2, 2, 2, 2, 1.5, 1, 1, 1, 1, 1, 0.7, 0.7, 0.7, 0.7, 0.7, 0.7,
@@ -59,23 +58,10 @@ def get_tolerances():
                     0.7, 0.7, 0.7, 0.7, 0.7, 0.7, 0.7, 0.7, 0.7, 0.7, 0.7, 1, 1.5, 2, 3, 3, 3, 3])
 
     # --- IEC 61672-1 Class 1 (Modern Precision) ---
-    up1 = []
-    low1 = []
-    for f in freqs:
-        if f < 25:
-             p, m = 2.5, np.inf
-        elif f < 100:
-            p, m = 1.5, 1.5
-        elif f <= 5000:
-            p, m = 1.1, 1.1 
-        elif f <= 16000:
-            p, m = 2.5, 2.5
-        else:
-            p, m = 3.0, 5.0
-        up1.append(p)
-        low1.append(m)
+    up1, minus1 = class1_tolerance(freqs)
+    low1 = -minus1
         
-    return freqs, up0, low0, np.array(up1), np.array(low1)
+    return freqs, up0, low0, up1, low1
 
 ftol, up0, low0, up1, low1 = get_tolerances()
 
@@ -91,60 +77,64 @@ ax_cmag = axs[0, 1]  # Top Right: C Mag
 ax_aerr = axs[1, 0]  # Bottom Left: A Error
 ax_cerr = axs[1, 1]  # Bottom Right: C Error
 
-f = np.logspace(1, np.log10(30000), 2048)
+# ~1000 log-spaced points per curve is all a log axis can show
+f = np.logspace(1, np.log10(30000), 1000)
+
+# Analog Response (Reference) depends only on f, so it is shared by every Fs
+_, ha = sg.freqs_zpk(Za, Pa, Ka, f * 2 * np.pi)
+_, hc = sg.freqs_zpk(Zc, Pc, Kc, f * 2 * np.pi)
+hadb = mag_db(ha)
+hcdb = mag_db(hc)
+
+def compute_fs(fs):
+    """
+    Designs the A/C filters for one sampling rate and returns their responses:
+    (hzadb, hzcdb, diffa, diffc, mask). Runs on a worker thread.
+    """
+    # Design Filters
+    wf_a = WeightingFilter(fs, 'A')
+    wf_c = WeightingFilter(fs, 'C')
+
+    # Calculate Digital Response
+    hza, hzc = sos_response([wf_a.sos, wf_c.sos], unit_circle(f, fs))
+    
+    hzadb = mag_db(hza, 1e-15)
+    hzcdb = mag_db(hzc, 1e-15)
+
+    # Error (Digital - Analog), limited to Nyquist
+    mask = f < fs/2
+    return hzadb, hzcdb, hzadb - hadb, hzcdb - hcdb, mask
 
 # --- 4. Main Loop Over Sampling Rates ---
-for i, fs in enumerate(FS_list):
-    wn = f * 2 * np.pi / fs
+# Every Fs is independent, so they are computed concurrently; plotting stays
+# on the main thread because matplotlib is not thread-safe.
+with ThreadPoolExecutor(max_workers=len(FS_list)) as pool:
+    futures = [pool.submit(compute_fs, fs) for fs in FS_list]
+
+for i, (fs, fut) in enumerate(zip(FS_list, futures)):
     ls = linestyles[i % len(linestyles)]
     color = colors[i]
     lbl = f'{fs} Hz'
 
     try:
-        # Design Filters
-        wf_a = WeightingFilter(fs, 'A')
-        wf_c = WeightingFilter(fs, 'C')
-        
-        # Calculate Analog Response (Reference)
-        _, ha = sg.freqs_zpk(Za, Pa, Ka, wn * fs)
-        _, hc = sg.freqs_zpk(Zc, Pc, Kc, wn * fs)
-        
-        hadb = 20 * np.log10(np.abs(ha))
-        hcdb = 20 * np.log10(np.abs(hc))
-
-        # Calculate Digital Response
-        _, hza = sg.sosfreqz(wf_a.sos, worN=wn)
-        _, hzc = sg.sosfreqz(wf_c.sos, worN=wn)
-        
-        hzadb = 20 * np.log10(np.abs(hza) + 1e-15)
-        hzcdb = 20 * np.log10(np.abs(hzc) + 1e-15)
-
-        # Plot Magnitude (Digital)
-        ax_amag.semilogx(f, hzadb, label=lbl, color=color, linestyle=ls, linewidth=1.2)
-        ax_cmag.semilogx(f, hzcdb, label=lbl, color=color, linestyle=ls, linewidth=1.2)
-
-        # Plot Error (Digital - Analog)
-        diffa = hzadb - hadb
-        diffc = hzcdb - hcdb
-        
-        # Limit error plot range to Nyquist
-        mask = f < fs/2
-        ax_aerr.semilogx(f[mask], diffa[mask], label=lbl, color=color, linestyle=ls, linewidth=1.2)
-        ax_cerr.semilogx(f[mask], diffc[mask], label=lbl, color=color, linestyle=ls, linewidth=1.2)
-
+        hzadb, hzcdb, diffa, diffc, mask = fut.result()
     except Exception as e:
         print(f"Skipping {fs}: {e}")
+        continue
+
+    # Plot Magnitude (Digital)
+    ax_amag.semilogx(f, hzadb, label=lbl, color=color, linestyle=ls, linewidth=1.2)
+    ax_cmag.semilogx(f, hzcdb, label=lbl, color=color, linestyle=ls, linewidth=1.2)
+
+    # Plot Error (Digital - Analog)
+    ax_aerr.semilogx(f[mask], diffa[mask], label=lbl, color=color, linestyle=ls, linewidth=1.2)
+    ax_cerr.semilogx(f[mask], diffc[mask], label=lbl, color=color, linestyle=ls, linewidth=1.2)
 
 # --- 5. Add Analog Reference & Tolerances ---
 
 # Plot Analog Reference on Magnitude plots
-_, ha_ref = sg.freqs_zpk(Za, Pa, Ka, f * 2 * np.pi)
-_, hc_ref = sg.freqs_zpk(Zc, Pc, Kc, f * 2 * np.pi)
-ha_ref_db = 20 * np.log10(np.abs(ha_ref))
-hc_ref_db = 20 * np.log10(np.abs(hc_ref))
-
-ax_amag.semilogx(f, ha_ref_db, 'k--', linewidth=2, label='Analog Ref', alpha=0.6)
-ax_cmag.semilogx(f, hc_ref_db, 'k--', linewidth=2, label='Analog Ref', alpha=0.6)
+ax_amag.semilogx(f, hadb, 'k--', linewidth=2, label='Analog Ref', alpha=0.6)
+ax_cmag.semilogx(f, hcdb, 'k--', linewidth=2, label='Analog Ref', alpha=0.6)
 
 # Plot Tolerance Masks on Error plots
 for ax in [ax_aerr, ax_cerr]:
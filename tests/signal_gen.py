@@ -0,0 +1,15 @@
+import math
+import numba
+import numpy as np
+
+@numba.njit(cache=True, fastmath=True, nogil=True)
+def gen_tone(fs, freq, n, amplitude=1.0):
+    """
+    Generates n samples of amplitude * sin(2*pi*freq*t) at sample rate fs.
+    Evaluates the phase per sample, so no time axis buffer is allocated.
+    """
+    dphi = 2.0 * math.pi * freq / fs
+    y = np.empty(n)
+    for i in range(n):
+        y[i] = amplitude * math.sin(dphi * i)
+    return y
@@ -1,6 +1,13 @@
+import functools
+import itertools
+import numba
 import numpy as np
 import soundfile as sf
+import scipy.fft
 import scipy.signal
+from numba import float32, float64
+from numpy.lib.stride_tricks import sliding_window_view
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Generator, Any
 
@@ -8,6 +15,60 @@ from .filters.weighting_filters import WeightingFilter, get_weighting_power_resp
 from .filters.octave_filters import OctaveFilterBank
 from .constants import Weighting, ResponseSpeed, BandResolution
 
+# Tags of the (kind, payload) items yielded by calculate_psd and
+# calculate_spectrogram: percent done, then the final result dict
+PROGRESS, RESULT = 0, 1
+
+@numba.njit(
+    [float64(x_t[:, ::1], float64[:], float64, float64, float64) for x_t in (float64, float32)],
+    cache=True, fastmath=True, nogil=True
+)
+def _envelope_max(x, out, state, a_rise, a_fall):
+    """
+    Runs the asymmetric exponential detector over the squares of samples x
+    (squared on the fly, no temporary), starting from state. x holds
+    consecutive blocks as rows; the envelope maximum over row j goes to
+    out[j], and the state carries on from one row to the next.
+    Compiled eagerly at import (explicit signature),
+    so run_analysis never waits on the JIT. float32 samples are widened before
+    squaring; the detector state is always float64.
+    
+    Returns:
+        float: The final state.
+    """
+    for j in range(x.shape[0]):
+        max_val = 0.0
+        for i in range(x.shape[1]):
+            xi = np.float64(x[j, i])
+            p2 = xi * xi
+            a = a_rise if p2 > state else a_fall
+            state = state + a * (p2 - state)
+            if state > max_val:
+                max_val = state
+        out[j] = max_val
+    return state
+
+@numba.njit(
+    [float64(x_t[:, ::1], float64[:], float64, float64) for x_t in (float64, float32)],
+    cache=True, fastmath=True, nogil=True
+)
+def _envelope_max_sym(x, out, state, a):
+    """
+    _envelope_max for equal rise and fall coefficients (FAST, SLOW): a plain
+    one-pole smoother with no compare/select in the loop.
+    
+    Returns:
+        float: The final state.
+    """
+    for j in range(x.shape[0]):
+        max_val = 0.0
+        for i in range(x.shape[1]):
+            xi = np.float64(x[j, i])
+            state = state + a * (xi * xi - state)
+            max_val = max(max_val, state)
+        out[j] = max_val
+    return state
+
 class TimeWeightingDetector:
     # Use | for Union types (Python 3.10+)
     def __init__(self, fs: float, mode: ResponseSpeed = ResponseSpeed.FAST, ref_pressure: float = 20e-6):
@@ -27,25 +88,83 @@ class TimeWeightingDetector:
             
         self.alpha_rise = 1.0 - np.exp(-1.0 / (fs * tau_rise))
         self.alpha_fall = 1.0 - np.exp(-1.0 / (fs * tau_fall))
+        
+        # Only IMPULSE needs the asymmetric rise/fall branch
+        if tau_rise == tau_fall:
+            self._kernel, self._coeffs = _envelope_max_sym, (self.alpha_rise,)
+        else:
+            self._kernel, self._coeffs = _envelope_max, (self.alpha_rise, self.alpha_fall)
 
     def process(self, chunk: np.ndarray) -> float:
-        p2 = chunk**2
-        current_val = self.state
-        max_val = 0.0
-        
-        a_rise = self.alpha_rise
-        a_fall = self.alpha_fall
-        
-        for s in p2:
-            if s > current_val:
-                current_val = (1 - a_rise) * current_val + a_rise * s
-            else:
-                current_val = (1 - a_fall) * current_val + a_fall * s
-            if current_val > max_val:
-                max_val = current_val
-        
-        self.state = current_val
-        return 10 * np.log10(max_val / (self.ref_pressure**2) + 1e-30)
+        return 10 * np.log10(self.process_power(chunk) / (self.ref_pressure**2) + 1e-30)
+
+    def process_power(self, chunk: np.ndarray) -> float:
+        """Like process, but returns the envelope maximum as squared pressure, not dB."""
+        x = np.ascontiguousarray(chunk, dtype=np.float32 if chunk.dtype == np.float32 else np.float64)
+        out = np.empty(1)
+        self.process_power_blocks(x[None, :], out)
+        return out[0]
+
+    def process_power_blocks(self, blocks: np.ndarray, out: np.ndarray):
+        """
+        process_power for each row of the C-contiguous 2D array blocks in
+        turn, in one kernel call; row j's envelope maximum is written to out[j].
+        """
+        self.state = self._kernel(blocks, out, self.state, *self._coeffs)
+
+# Frames decoded per file read. Shorter blocks are read this many frames at a
+# time and handed out as views, so a 10 ms block size does not pay one
+# libsndfile call (and one reader-thread round trip) per block
+_READ_FRAMES = 1 << 16
+
+def _aligned_empty(shape, dtype, align: int = 64) -> np.ndarray:
+    """
+    np.empty, but with the data pointer on an `align`-byte boundary (a cache
+    line, and the widest SIMD load). NumPy itself only guarantees 16 bytes.
+    The result is C-contiguous.
+    """
+    dtype = np.dtype(dtype)
+    n = int(np.prod(shape))
+    buf = np.empty(n * dtype.itemsize + align, dtype=np.uint8)
+    offset = (-buf.ctypes.data) % align
+    return buf[offset:offset + n * dtype.itemsize].view(dtype).reshape(shape)
+
+@functools.lru_cache(maxsize=32)
+def _weighting_grid(fs: float, nfft: int, weighting: str) -> np.ndarray:
+    """
+    Power weighting |H(f)|^2 on the one-sided FFT grid of nfft points, as used by
+    the PSD and spectrogram. Depends only on (fs, nfft, weighting), so it is
+    memoized and returned read-only.
+    """
+    freqs = np.fft.rfftfreq(nfft, 1.0 / fs)
+    w = get_weighting_power_response(freqs, weighting)
+    w.setflags(write=False)
+    return w
+
+def _welch_density(x: np.ndarray, win: np.ndarray, step: int, scale: float) -> np.ndarray:
+    """
+    One-sided Welch PSD of x, identical to scipy.signal.welch(..., scaling='density')
+    with nperseg = nfft = len(win) and noverlap = len(win) - step, but with the
+    window and its scale (1 / (fs * sum(win^2))) built once by the caller.
+    x may be (n,) or (rows, n); each row is a separate signal and gets its own
+    PSD row. All segments of all rows go through one batched, multithreaded rfft.
+    """
+    segs = sliding_window_view(x, win.shape[0], axis=-1)[..., ::step, :]
+    segs = segs - segs.mean(axis=-1, keepdims=True)  # welch's default 'constant' detrend
+    # In the segments' dtype: a float64 window would make this in-place float32
+    # multiply run through NumPy's casting loop, at several times the cost
+    segs *= win.astype(segs.dtype, copy=False)
+    # pocketfft plans in well under a millisecond and keeps its plans cached
+    # in-process, so there is no planning cost worth persisting across runs
+    spec = scipy.fft.rfft(segs, axis=-1, workers=-1)
+    pxx = np.einsum('...ij,...ij->...j', spec.real, spec.real) + np.einsum('...ij,...ij->...j', spec.imag, spec.imag)
+    pxx *= scale / segs.shape[-2]
+    # Fold negative frequencies in: every bin but DC (and Nyquist, for even lengths)
+    if win.shape[0] % 2:
+        pxx[..., 1:] *= 2
+    else:
+        pxx[..., 1:-1] *= 2
+    return pxx
 
 class StreamProcessor:
     def __init__(self, filepath: str | Path, cal_factor: float = 1.0):
@@ -57,10 +176,66 @@ class StreamProcessor:
         try:
             info = sf.info(str(self.filepath))
             self.fs = info.samplerate
+            self.frames = info.frames
             self.duration = info.duration
         except Exception as e:
             raise ValueError(f"Could not read file info: {e}")
 
+    def n_blocks(self, block_size_ms: float) -> int:
+        """Number of blocks run_analysis yields for block_size_ms (the last one zero-padded)."""
+        block_samples = int(self.fs * (block_size_ms / 1000.0))
+        return -(-self.frames // block_samples) if block_samples else 0
+
+    def _read_blocks(self, f: sf.SoundFile, block_samples: int) -> Generator[np.ndarray, None, None]:
+        """
+        Yields calibrated mono float32 blocks of block_samples from the open
+        file f, zero-padding the last one like f.blocks(..., fill_value=0.0).
+        float32 keeps the full resolution of 24-bit PCM at half the bandwidth.
+        
+        Blocks shorter than _READ_FRAMES are read several at a time and
+        yielded as consecutive views of one buffer.
+        
+        Reads are double-buffered: while the caller works on one read's blocks,
+        a background thread decodes the next into the other preallocated buffer
+        (soundfile and NumPy release the GIL, so the two overlap). A yielded
+        block is therefore only valid until the next one is requested, and f
+        must not be touched by the caller while the generator is running.
+        """
+        per_read = max(1, _READ_FRAMES // block_samples)
+        read_samples = per_read * block_samples
+        buffers = []
+        for _ in range(2):
+            if f.channels > 1:
+                raw = _aligned_empty((read_samples, f.channels), np.float32)
+                mono = _aligned_empty(read_samples, np.float32)
+            else:
+                raw = mono = _aligned_empty(read_samples, np.float32)
+            buffers.append((raw, mono))
+        # The 1/channels of the mixdown rides along with the calibration multiply
+        gain = self.cal_factor / f.channels
+        ones = np.ones(f.channels, dtype=np.float32)
+        
+        def fill(raw, mono):
+            remaining = f.frames - f.tell()
+            if remaining <= 0:
+                return None
+            f.read(out=raw, fill_value=0.0)
+            # Channel sum as a matrix-vector product (see calibration.py): as
+            # np.sum(axis=1) it cost more than decoding the samples
+            if f.channels > 1: np.matmul(raw, ones, out=mono)
+            np.multiply(mono, gain, out=mono)
+            # Whole blocks only; the last one keeps its zero padding
+            return mono[:min(per_read, -(-remaining // block_samples)) * block_samples]
+        
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            pending = reader.submit(fill, *buffers[0])
+            i = 0
+            while (chunk := pending.result()) is not None:
+                i ^= 1
+                pending = reader.submit(fill, *buffers[i])
+                for start in range(0, len(chunk), block_samples):
+                    yield chunk[start:start + block_samples]
+
     def _get_window_map(self):
         """Centralized window mapping for consistency."""
         return {
@@ -77,17 +252,20 @@ class StreamProcessor:
                       nfft: int = 4096, 
                       window_type: str = 'Hanning', 
                       weighting: Weighting = Weighting.A
-                      ) -> Generator[dict[str, Any], None, None]:
+                      ) -> Generator[tuple[int, Any], None, None]:
+        """Yields (PROGRESS, percent) per chunk, then (RESULT, psd dict)."""
         
         win_map = self._get_window_map()
         scipy_window = win_map.get(window_type, 'hann')
+        # pocketfft is fastest on 2/3/5/7-smooth lengths; the GUI's powers of two
+        # pass through unchanged, odd API sizes are rounded up to the next one
+        nfft = scipy.fft.next_fast_len(nfft, real=True)
         
         chunk_size_sec = 10.0
         chunk_samples = int(self.fs * chunk_size_sec)
         
         pxx_sum = None
         count = 0
-        freqs = None
         
         total_samples = int(self.duration * self.fs)
         processed_samples = 0
@@ -95,36 +273,34 @@ class StreamProcessor:
         nperseg = nfft
         noverlap = nfft // 2
         
+        # Window and density scale are the same for every chunk
+        win = scipy.signal.get_window(scipy_window, nperseg)
+        scale = 1.0 / (self.fs * np.dot(win, win))
+        freqs = np.fft.rfftfreq(nfft, 1.0 / self.fs)
+        
         with sf.SoundFile(str(self.filepath)) as f:
-            for chunk in f.blocks(blocksize=chunk_samples, always_2d=False, fill_value=0.0):
+            for chunk in self._read_blocks(f, chunk_samples):
                 if len(chunk) < nperseg:
                     continue 
                 
-                chunk = chunk * self.cal_factor
-                if chunk.ndim > 1: chunk = np.mean(chunk, axis=1) 
-                
-                f_c, pxx_c = scipy.signal.welch(chunk, fs=self.fs, window=scipy_window,
-                                                nperseg=nperseg, noverlap=noverlap,
-                                                nfft=nfft, scaling='density')
+                pxx_c = _welch_density(chunk, win, nperseg - noverlap, scale)
                 
                 if pxx_sum is None:
                     pxx_sum = pxx_c
-                    freqs = f_c
                 else:
                     pxx_sum += pxx_c
                 
                 count += 1
                 processed_samples += len(chunk)
-                yield int(100 * processed_samples / total_samples)
+                yield PROGRESS, int(100 * processed_samples / total_samples)
 
         if pxx_sum is None or count == 0:
              raise ValueError("Data too short for specified FFT size.")
 
-        pxx_avg = pxx_sum / count
-        w_response = get_weighting_power_response(freqs, weighting)
-        pxx_weighted = pxx_avg * w_response
+        pxx_weighted = pxx_sum / count
+        pxx_weighted *= _weighting_grid(self.fs, nfft, weighting)
         
-        yield {
+        yield RESULT, {
             'type': 'psd',
             'freqs': freqs,
             'pxx': pxx_weighted,
@@ -138,53 +314,68 @@ class StreamProcessor:
                               dt: float = 1.0, 
                               window_type: str = 'Hamming', 
                               weighting: Weighting = Weighting.A
-                              ) -> Generator[dict[str, Any], None, None]:
+                              ) -> Generator[tuple[int, Any], None, None]:
+        """Yields (PROGRESS, percent) per slice, then (RESULT, spectrogram dict)."""
         
         win_map = self._get_window_map()
         scipy_window = win_map.get(window_type, 'hamming')
+        nfft = scipy.fft.next_fast_len(nfft, real=True)  # see calculate_psd
         
         noverlap = nfft // 2
         chunk_samples = int(self.fs * dt)
         if chunk_samples < nfft: chunk_samples = nfft
         
-        results_pxx = []
-        time_axis = []
-        freqs = None
+        # Window and density scale are the same for every slice
+        win = scipy.signal.get_window(scipy_window, nfft)
+        scale = 1.0 / (self.fs * np.dot(win, win))
+        freqs = np.fft.rfftfreq(nfft, 1.0 / self.fs)
         
         total_samples = int(self.duration * self.fs)
         processed_samples = 0
         current_time = 0.0
+        n_rows = 0
         
         with sf.SoundFile(str(self.filepath)) as f:
-            for chunk in f.blocks(blocksize=chunk_samples, always_2d=False, fill_value=0.0):
+            # One row per (zero-padded) block, written in place; float32 is
+            # plenty for a dB display and halves the matrix
+            n_blocks = -(-f.frames // chunk_samples)
+            S_matrix = np.empty((n_blocks, len(freqs)), dtype=np.float32)
+            time_axis = np.empty(n_blocks, dtype=np.float64)
+            
+            # Short slices are staged and transformed together (up to
+            # _READ_FRAMES samples per call), so a small dt does not pay
+            # NumPy's per-call overhead for a handful of segments each
+            stage = np.empty((max(1, _READ_FRAMES // chunk_samples), chunk_samples), dtype=np.float32)
+            n_staged = 0
+            
+            for chunk in self._read_blocks(f, chunk_samples):
                 if len(chunk) < nfft: continue 
                 
-                chunk = chunk * self.cal_factor
-                if chunk.ndim > 1: chunk = np.mean(chunk, axis=1)
-                
-                f_c, pxx_c = scipy.signal.welch(chunk, fs=self.fs, window=scipy_window,
-                                                nperseg=nfft, noverlap=noverlap,
-                                                nfft=nfft, scaling='density')
-                
-                if freqs is None: freqs = f_c
-                
-                results_pxx.append(pxx_c)
-                time_axis.append(current_time)
+                stage[n_staged] = chunk
+                time_axis[n_rows + n_staged] = current_time
+                n_staged += 1
                 
                 current_time += (len(chunk) / self.fs)
                 processed_samples += len(chunk)
-                yield int(100 * processed_samples / total_samples)
+                if n_staged == len(stage):
+                    S_matrix[n_rows:n_rows + n_staged] = _welch_density(stage, win, nfft - noverlap, scale)
+                    n_rows += n_staged
+                    n_staged = 0
+                    yield PROGRESS, int(100 * processed_samples / total_samples)
+            
+            if n_staged:
+                S_matrix[n_rows:n_rows + n_staged] = _welch_density(stage[:n_staged], win, nfft - noverlap, scale)
+                n_rows += n_staged
 
-        if not results_pxx:
+        if n_rows == 0:
              raise ValueError("File too short for spectrogram analysis.")
 
-        S_matrix = np.array(results_pxx)
-        w_response = get_weighting_power_response(freqs, weighting)
-        S_matrix = S_matrix * w_response[np.newaxis, :]
+        S_matrix = S_matrix[:n_rows]
+        S_matrix *= _weighting_grid(self.fs, nfft, weighting)
         
-        yield {
+        yield RESULT, {
             'type': 'spectrogram',
-            'times': np.array(time_axis),
+            'times': time_axis[:n_rows],
             'freqs': freqs,
             'pxx_matrix': S_matrix, 
             'nfft': nfft,
@@ -199,8 +390,63 @@ class StreamProcessor:
                      band_resolution: BandResolution = BandResolution.OCTAVE,
                      band_order: int = 24,
                      time_weighting: ResponseSpeed = ResponseSpeed.FAST,
-                     ref_pressure: float = 20e-6
+                     ref_pressure: float = 20e-6,
+                     batch: int = 1,
+                     raw_power: bool = False
                      ) -> Generator[dict[str, Any], None, None]:
+        """
+        Yields one result dict per block ('time', 'leq', 'lp' and optionally
+        'bands'/'band_freqs').
+        
+        This is a per-block view of run_analysis_batched, which takes the same
+        arguments: the results are the same for any batch; batch > 1 only makes
+        the generator hand them out in bursts.
+        
+        With raw_power=True the log10 is skipped: blocks carry 'leq_lin',
+        'lp_lin' and 'bands_lin' as linear ratios p^2 / ref_pressure^2 instead,
+        i.e. 10**(level/10). They order the same way as the dB values, so a
+        caller thresholding at L dB can compare against 10**(L/10) directly and
+        convert to dB in bulk when (if ever) it needs to.
+        """
+        for cols in self.run_analysis_batched(
+                block_size_ms, weighting, do_band_analysis, band_resolution, band_order,
+                time_weighting, ref_pressure, batch=batch, raw_power=raw_power):
+            keys = [k for k in cols if k != 'band_freqs']
+            for i in range(len(cols['time'])):
+                result = {k: cols[k][i] for k in keys}
+                if 'band_freqs' in cols:
+                    result['band_freqs'] = cols['band_freqs']
+                yield result
+
+    def run_analysis_batched(self, 
+                             block_size_ms: float = 100.0, 
+                             weighting: Weighting = Weighting.A, 
+                             do_band_analysis: bool = False, 
+                             band_resolution: BandResolution = BandResolution.OCTAVE,
+                             band_order: int = 24,
+                             time_weighting: ResponseSpeed = ResponseSpeed.FAST,
+                             ref_pressure: float = 20e-6,
+                             batch: int = 64,
+                             raw_power: bool = False
+                             ) -> Generator[dict[str, np.ndarray], None, None]:
+        """
+        Yields the block results in batches of up to `batch` blocks, one array
+        per quantity: 'time', 'leq', 'lp' of shape (n,), plus 'bands' (n, n_bands)
+        and 'band_freqs' (n_bands,) with band analysis. raw_power=True renames
+        the levels to 'leq_lin', 'lp_lin', 'bands_lin' (see run_analysis).
+        
+        Block mean squares are collected for a batch and converted to dB with a
+        single vectorized log10, so a caller filling column arrays pays no
+        per-block Python work. The yielded arrays are fresh per batch.
+        
+        The file is analysed front to back in one pass, not in parallel time
+        segments: the weighting and band filters and the Lp detector carry
+        state from block to block (SLOW integrates over 1 s, the lowest bands
+        ring for seconds), so separately started segments would not reproduce
+        a continuous measurement at their boundaries. Cores are used across
+        bands instead (the bank's prange kernel), with decoding on the reader
+        thread.
+        """
         
         weighting_filter = WeightingFilter(self.fs, weighting)
         lp_detector = TimeWeightingDetector(self.fs, time_weighting, ref_pressure)
@@ -213,34 +459,70 @@ class StreamProcessor:
         if block_samples == 0: raise ValueError("Block size too small.")
         
         with sf.SoundFile(str(self.filepath)) as f:
-            seed_data = f.read(block_samples, always_2d=False, fill_value=0.0)
-            if seed_data.ndim > 1: seed_data = np.mean(seed_data, axis=1)
-            seed_data = seed_data * self.cal_factor
+            # The first block seeds the filters and detector, then is analysed
+            # as the first block itself, so the file is read once, front to back
+            blocks = self._read_blocks(f, block_samples)
+            seed_data = next(blocks, None)
+            if seed_data is not None:
+                weighting_filter.initialize_state(seed_data)
+                if band_bank: band_bank.initialize_state(seed_data)
+                lp_detector.process_power(seed_data)
+                blocks = itertools.chain((seed_data,), blocks)
+
+            # Row per block: [leq ms, lp envelope max, band ms...]
+            batch = max(1, int(batch))
+            n_bands = band_bank.n_bands if band_bank else 0
+            ms_buf = np.empty((batch, 2 + n_bands), dtype=np.float64)
+            # Weighted blocks are kept as rows until the detector runs over all
+            # of them in one call (at most _READ_FRAMES samples, and the batch);
+            # the calibrated blocks likewise for the band bank
+            det_rows = max(1, min(batch, _READ_FRAMES // block_samples))
+            weighted_buf = _aligned_empty((det_rows, block_samples), np.float64)
+            if band_bank:
+                band_buf = _aligned_empty((det_rows, block_samples), np.float32)
+            inv_ref2 = 1.0 / (ref_pressure**2)
+            block_s = block_size_ms / 1000.0
             
-            weighting_filter.initialize_state(seed_data)
-            if band_bank: band_bank.initialize_state(seed_data)
-            lp_detector.process(seed_data) 
+            if raw_power:
+                keys = ('leq_lin', 'lp_lin', 'bands_lin')
+            else:
+                keys = ('leq', 'lp', 'bands')
             
-            f.seek(0)
-
-            current_time = 0.0
-            block_gen = f.blocks(blocksize=block_samples, always_2d=False, fill_value=0.0)
+            done = 0
+            def flush(n):
+                nonlocal done
+                if raw_power:
+                    levels = ms_buf[:n] * inv_ref2
+                else:
+                    levels = 10 * np.log10(ms_buf[:n] * inv_ref2 + 1e-30)
+                cols = {'time': np.arange(done, done + n) * block_s,
+                        keys[0]: levels[:, 0], keys[1]: levels[:, 1]}
+                if band_bank:
+                    cols[keys[2]] = levels[:, 2:]
+                    cols['band_freqs'] = band_bank.frequencies
+                done += n
+                return cols
             
-            for chunk in block_gen:
-                if chunk.ndim > 1: chunk = np.mean(chunk, axis=1)
-                calibrated_chunk = chunk * self.cal_factor
-                weighted_chunk = weighting_filter.process_chunk(calibrated_chunk)
-                ms_broadband = np.mean(weighted_chunk**2)
-                leq_block = 10 * np.log10(ms_broadband / (ref_pressure**2) + 1e-30)
-                lp_block = lp_detector.process(weighted_chunk)
-                
-                result = {'time': current_time, 'leq': leq_block, 'lp': lp_block}
+            n = r = 0
+            for calibrated_chunk in blocks:
+                row = weighted_buf[r]
+                # Mean square is accumulated by the filter kernel in the same pass
+                weighted_chunk, ms_buf[n, 0] = weighting_filter.process_chunk_ms(calibrated_chunk, out=row)
+                if weighted_chunk is not row: row[:] = weighted_chunk # 'Z' passes the input through
+                if band_bank: band_buf[r] = calibrated_chunk
                 
-                if band_bank:
-                    filtered_bands = band_bank.process_chunk(calibrated_chunk)
-                    ms_bands = np.mean(filtered_bands**2, axis=0)
-                    result['bands'] = 10 * np.log10(ms_bands / (ref_pressure**2) + 1e-30)
-                    result['band_freqs'] = band_bank.frequencies
-
-                yield result
-                current_time += (block_size_ms / 1000.0)
\ No newline at end of file
+                n += 1
+                r += 1
+                if r == det_rows or n == batch:
+                    lp_detector.process_power_blocks(weighted_buf[:r], ms_buf[n - r:n, 1])
+                    if band_bank: band_bank.mean_square_blocks(band_buf[:r], ms_buf[n - r:n, 2:])
+                    r = 0
+                if n == batch:
+                    yield flush(n)
+                    n = 0
+            
+            if n:
+                if r:
+                    lp_detector.process_power_blocks(weighted_buf[:r], ms_buf[n - r:n, 1])
+                    if band_bank: band_bank.mean_square_blocks(band_buf[:r], ms_buf[n - r:n, 2:])
+                yield flush(n)
@@ -1,7 +1,8 @@
 # ... (Imports unchanged) ...
 import traceback
 from pathlib import Path
-from PySide6.QtCore import QObject, Signal, Slot
+import numpy as np
+from PySide6.QtCore import QObject, Qt, Signal, Slot
 from .settings_manager import SettingsManager, AppSettings
 from .gui.analysis_worker import AnalysisWorker
 from .result_exporter import ResultsExporter
@@ -12,7 +13,7 @@ class VSLMController(QObject):
     sig_file_loaded = Signal(object, object)
     sig_analysis_started = Signal(str)
     sig_analysis_progress = Signal(int)
-    sig_analysis_finished = Signal(list)
+    sig_analysis_finished = Signal(object)
     sig_analysis_error = Signal(str)
     sig_status_message = Signal(str)
     sig_export_finished = Signal()
@@ -23,9 +24,15 @@ class VSLMController(QObject):
         self.settings_mgr = SettingsManager()
         self.settings = self.settings_mgr.load()
         self.filepath: Path | None = None
+        # soundfile.info of the loaded file, kept so the header is parsed once per load
+        self.file_info = None
         self.start_time: float = 0.0
         self.end_time: float | None = None
-        self.last_results: list = []
+        # Level modes: columnar table of arrays ('time', 'leq', 'lp'[, 'bands',
+        # 'band_freqs']); PSD/spectrogram: their result dict (with a 'type' key)
+        self.last_results: dict = {}
+        # Ascending block start times of last_results (empty for PSD/spectrogram)
+        self.last_times = np.empty(0)
         self.worker: AnalysisWorker | None = None
         self.cal_factor = self.settings.calibration_factor
         self.total_blocks_estimate = 100
@@ -37,10 +44,12 @@ class VSLMController(QObject):
             from soundfile import info
             inf = info(str(path))
             self.filepath = path
+            self.file_info = inf
             self.settings.last_directory = str(path.parent)
             self.start_time = 0.0
             self.end_time = inf.duration
-            self.last_results = []
+            self.last_results = {}
+            self.last_times = np.empty(0)
             self.sig_file_loaded.emit(path, inf)
             self.sig_status_message.emit("File loaded successfully.")
         except Exception as e:
@@ -70,7 +79,11 @@ class VSLMController(QObject):
         s = self.settings.speed
         speed_val = s.value if hasattr(s, 'value') else s
         
-        if self.worker and self.worker.isRunning(): self.worker.stop()
+        # The pool only holds a pointer to the runnable, so let a stopped run
+        # return before the last reference to it is replaced
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait()
         
         calc_block_ms = self.settings.block_size_ms 
         if is_lp:
@@ -111,11 +124,13 @@ class VSLMController(QObject):
         )
 
         self.worker.sig_total_blocks.connect(self.sig_total_blocks.emit)
-        self.worker.sig_progress.connect(self.sig_analysis_progress.emit)
-        self.worker.sig_error.connect(self.sig_analysis_error.emit)
+        # Explicitly queued: progress arrives from a pool thread and is only
+        # delivered when the GUI event loop gets to it
+        self.worker.sig_progress.connect(self.sig_analysis_progress.emit, Qt.QueuedConnection)
+        self.worker.sig_error.connect(self._on_worker_error)
         self.worker.sig_finished.connect(self._on_worker_finished)
-        self.worker.start()
-        self.sig_analysis_started.emit(str(speed_val))
+        if self.worker.start():
+            self.sig_analysis_started.emit(str(speed_val))
 
     # ... (Rest unchanged) ...
     def stop_analysis(self):
@@ -124,13 +139,27 @@ class VSLMController(QObject):
             self.worker.wait()
             self.sig_status_message.emit("Analysis stopped by user.")
 
+    def _on_worker_error(self, exc_info):
+        _, e, _ = exc_info
+        tb = ''.join(traceback.format_exception(*exc_info))
+        self.sig_analysis_error.emit(f"{str(e)}\n\nTraceback:\n{tb}")
+
     def _on_worker_finished(self, results):
-        if results and isinstance(results[0], dict) and results[0].get('type') in ['psd', 'spectrogram']:
+        times = np.empty(0)
+        if 'type' in results:
             filtered = results
         else:
-            if self.end_time: filtered = [r for r in results if self.start_time <= r['time'] <= self.end_time]
+            times = results['time']
+            if self.end_time:
+                # Block times ascend, so start <= t <= end is one contiguous slice
+                # of every column (band_freqs is per band, not per block)
+                lo = np.searchsorted(times, self.start_time, side='left')
+                hi = np.searchsorted(times, self.end_time, side='right')
+                filtered = {k: v if k == 'band_freqs' else v[lo:hi] for k, v in results.items()}
+                times = filtered['time']
             else: filtered = results
         self.last_results = filtered
+        self.last_times = times
         self.sig_analysis_finished.emit(filtered)
         self.sig_status_message.emit("Analysis Complete.")
 
@@ -141,11 +170,10 @@ class VSLMController(QObject):
             weighting = w.value if hasattr(w, 'value') else w
             s = self.settings.speed
             speed = s.value if hasattr(s, 'value') else s
-            dose_std_name = self.settings.current_dose_standard
-            dose_params = self.settings.dose_standards.get(dose_std_name)
+            dose_params = self.settings.dose_standards.get(self.settings.current_dose_standard)
             
             if mode_id == 1:
-                 ResultsExporter.export_leq(path, self.last_results, self.settings.block_size_ms, leq_interval_key, weighting, dose_params, dose_std_name, self.settings.ref_pressure)
+                 ResultsExporter.export_leq(path, self.last_results, self.settings.block_size_ms, leq_interval_key, weighting, dose_params, self.settings.ref_pressure)
             elif mode_id == 0:
                 ResultsExporter.export_lp(path, self.last_results, weighting, speed)
             elif mode_id in [2, 3]:
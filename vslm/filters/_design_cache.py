@@ -0,0 +1,63 @@
+# python2/vslm/filters/_design_cache.py
+"""
+On-disk cache for designed filter coefficients.
+
+Designs are deterministic per key (kind, fs, ...), but the weighting design
+runs a Lawson-reweighted, bounded least-squares fit and an octave bank designs
+~30 high-order bands, so every new process used to pay for them again. Results are stored as
+.npz under ~/.vslm_cache/filters and loaded on later launches.
+
+VSLM_CACHE_DIR overrides the location; setting it to an empty string
+disables the disk cache.
+"""
+import os
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+# Bump whenever a design routine changes, so stale coefficients are never loaded
+DESIGN_VERSION = 5
+
+def _cache_dir():
+    root = os.environ.get('VSLM_CACHE_DIR')
+    if root is None:
+        return Path.home() / ".vslm_cache" / "filters"
+    return Path(root) if root else None
+
+def load_or_design(key, design):
+    """
+    Returns the arrays stored under key, or builds them with design() and
+    stores them for next time.
+    A missing, unreadable or unwritable cache only costs the redesign; it
+    never fails the caller.
+
+    Args:
+        key (str): File-name-safe identifier of the design, e.g. 'weighting_A_48000'.
+        design (callable): Returns a dict of name -> np.ndarray.
+
+    Returns:
+        dict: name -> np.ndarray.
+    """
+    cache_dir = _cache_dir()
+    if cache_dir is None:
+        return design()
+
+    path = cache_dir / f"{key}_v{DESIGN_VERSION}.npz"
+    try:
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    except (OSError, ValueError, zipfile.BadZipFile):
+        pass
+
+    arrays = design()
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so a concurrent reader never sees a partial file
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, 'wb') as fh:
+            np.savez(fh, **arrays)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return arrays
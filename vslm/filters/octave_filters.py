@@ -1,7 +1,18 @@
 # python2/vslm/filters/ansi.py
+import functools
 import numpy as np
 import scipy.signal
 
+from ._design_cache import load_or_design
+from .sos_kernels import sosfilt_bank, sosfilt_bank_sumsq
+from .weighting_filters import ISO_FREQS
+
+# initialize_state only looks this many time constants (1 / bandwidth) of the
+# lowest band into the seed block; the higher bands settle faster still.
+# The steep high-order bands ring long: 40 keeps the seeded state within
+# 1e-4 dB of a full-block seed
+_WARMUP_TIME_CONSTANTS = 40
+
 def get_ansi_center_frequencies(resolution='octave', base=10):
     """Returns exact Center Frequencies (Fc) based on ANSI S1.11-2004."""
     f_ref = 1000.0
@@ -59,15 +70,17 @@ def design_compliant_sos(fc, fs, resolution='third', order=24):
     )
     return sos
 
-class OctaveFilterBank:
+@functools.lru_cache(maxsize=16)
+def _design_bank(fs, resolution, order):
     """
-    Manages a bank of stateful high-order bandpass filters.
+    Designs every band of a filter bank once per (fs, resolution, order).
+    
+    Returns:
+        tuple: (centers, sos_stack, zi0_stack) for the bands that could be
+        designed, as read-only arrays; sos_stack is (n_bands, n_sections, 6)
+        and zi0_stack the matching (n_bands, n_sections, 2) sosfilt_zi state.
     """
-    def __init__(self, fs, resolution='octave', order=24):
-        self.fs = fs
-        self.resolution = resolution
-        self.filters = [] 
-        
+    def design():
         all_centers = get_ansi_center_frequencies(resolution, base=10)
         
         if resolution == 'octave':
@@ -78,58 +91,147 @@ class OctaveFilterBank:
         cutoff_limit = (fs / 2.0) / factor * 0.95
         valid_centers = all_centers[all_centers < cutoff_limit]
         
-        self.frequencies = valid_centers
-        
+        designed_centers = []
+        sos_list = []
         for fc in valid_centers:
             try:
-                sos = design_compliant_sos(fc, fs, resolution, order)
-                zi = scipy.signal.sosfilt_zi(sos)
-                
-                self.filters.append({
-                    'fc': fc,
-                    'sos': sos,
-                    'zi': zi
-                })
+                sos_list.append(design_compliant_sos(fc, fs, resolution, order))
+                designed_centers.append(fc)
             except Exception as e:
                 print(f"Warning: Could not design filter for {fc:.1f} Hz: {e}")
+        # zi0 is ~1 ms of sosfilt_zi per band, most of a cold start once the
+        # coefficients come from disk, so it is stored alongside them
+        sos_stack = np.stack(sos_list)
+        zi0_stack = np.stack([scipy.signal.sosfilt_zi(sos) for sos in sos_stack])
+        return {'centers': np.array(designed_centers), 'sos_stack': sos_stack, 'zi0_stack': zi0_stack}
+    
+    # Persisted across launches (see _design_cache)
+    arrays = load_or_design(f"octave_{resolution}_{order}_{fs:g}", design)
+    centers = arrays['centers']
+    # Coefficients must stay float64 even for float32 audio: the zpk->sos split
+    # puts a band's whole gain in its first numerator (~1e-73 for the 16 Hz
+    # octave), which flushes to zero in float32, and the low-band poles sit
+    # within 1e-4 of the unit circle. Only the samples may be float32.
+    sos_stack = np.ascontiguousarray(arrays['sos_stack'], dtype=np.float64)
+    zi0_stack = np.ascontiguousarray(arrays['zi0_stack'], dtype=np.float64)
+    for arr in (centers, sos_stack, zi0_stack):
+        arr.setflags(write=False)
+    return centers, sos_stack, zi0_stack
+
+class OctaveFilterBank:
+    """
+    Manages a bank of stateful high-order bandpass filters.
+    """
+    def __init__(self, fs, resolution='octave', order=24):
+        self.fs = fs
+        self.resolution = resolution
+        
+        # Band b is column b of process_chunk output, row b of the stacks
+        self.frequencies, self.sos_stack, self.zi0 = _design_bank(fs, resolution, order)
+        self.n_bands = len(self.frequencies)
+        
+        # Nominal ISO label (e.g. 8000 for 7943.3 Hz) -> band index, for exact lookups
+        nearest = np.argmin(np.abs(np.log(self.frequencies[:, None] / ISO_FREQS[None, :])), axis=1)
+        self.band_index = {float(ISO_FREQS[k]): b for b, k in enumerate(nearest)}
+        
+        # Seed length for initialize_state, set by the slowest (lowest) band
+        factor = 2**(1.0/2.0) if resolution == 'octave' else 2**(1.0/6.0)
+        lowest_bw = self.frequencies[0] * (factor - 1.0 / factor) if self.n_bands else fs
+        self._warm_len = int(_WARMUP_TIME_CONSTANTS * fs / lowest_bw)
+        
+        # Filter state for all bands as one contiguous (n_bands, n_sections, 2)
+        # tensor, starting from the pristine design-time state zi0
+        self.zi_stack = self.zi0.copy()
+
+    def index_of(self, freqs):
+        """
+        Returns the index of the band whose center frequency is nearest to each
+        requested frequency (scalar in -> int out, array in -> array out).
+        Binary search over the ascending self.frequencies.
+        """
+        f = np.asarray(freqs, dtype=float)
+        if self.n_bands < 2:
+            idx = np.zeros(f.shape, dtype=np.intp)
+        else:
+            hi = np.clip(np.searchsorted(self.frequencies, f), 1, self.n_bands - 1)
+            lo = hi - 1
+            idx = np.where(f - self.frequencies[lo] <= self.frequencies[hi] - f, lo, hi)
+        return int(idx) if idx.ndim == 0 else idx
+
+    def get_sos(self, idx):
+        """
+        Returns the (n_sections, 6) coefficients of band idx as a read-only view,
+        e.g. for scipy.signal.sosfreqz.
+        """
+        return self.sos_stack[idx]
 
     def reset(self):
         """Resets the state of all filters in the bank."""
-        for band in self.filters:
-            band['zi'] = scipy.signal.sosfilt_zi(band['sos'])
+        np.copyto(self.zi_stack, self.zi0)
 
-    def initialize_state(self, chunk_data):
+    def initialize_state(self, chunk_data=None):
         """
         Seeds all filters in the bank to minimize transient glitches.
-        Runs forward-backward on the provided chunk.
+        Runs forward-backward on the head of the provided chunk (enough
+        samples for the lowest band to settle, or all of it if shorter);
+        None starts every band from rest (zero state) without a priming buffer.
         """
-        for band in self.filters:
-            # 1. Forward pass
-            zi_init = np.zeros_like(band['zi'])
-            _, zi_fwd = scipy.signal.sosfilt(band['sos'], chunk_data, zi=zi_init)
-            
-            # 2. Backward pass
-            _, zi_bwd = scipy.signal.sosfilt(band['sos'], chunk_data[::-1], zi=zi_fwd)
-            
-            # 3. Update state
-            band['zi'] = zi_bwd
+        if chunk_data is None:
+            self.zi_stack[:] = 0.0
+            return
+        
+        x = np.array(chunk_data[:self._warm_len], dtype=np.float64)
+        # Only the final state matters, so run the sum-of-squares kernel and
+        # skip materializing the (n_samples, n_bands) output of either pass
+        sumsq = np.empty((1, self.n_bands), dtype=np.float64)
+        
+        # 1. Forward pass (from zero state)
+        self.zi_stack[:] = 0.0
+        sosfilt_bank_sumsq(self.sos_stack, self.zi_stack, x[None, :], sumsq)
+        
+        # 2. Backward pass -> state at start of chunk, left in zi_stack
+        sosfilt_bank_sumsq(self.sos_stack, self.zi_stack, np.ascontiguousarray(x[None, ::-1]), sumsq)
 
-    def process_chunk(self, chunk_data):
+    def process_chunk(self, chunk_data, out=None):
         """
         Processes a chunk of audio through the entire filter bank.
-        """
-        n_samples = len(chunk_data)
-        n_bands = len(self.filters)
+        Bands are filtered in parallel by the compiled kernel.
+        float32 input yields float32 output; anything else is run as float64.
         
-        output = np.zeros((n_samples, n_bands), dtype=chunk_data.dtype)
+        Args:
+            chunk_data (np.ndarray): Input samples.
+            out (np.ndarray, optional): C-contiguous (n_samples, n_bands) float32
+                or float64 destination; its dtype then sets the output dtype.
+        """
+        if out is None:
+            dtype = np.float32 if chunk_data.dtype == np.float32 else np.float64
+            out = np.empty((len(chunk_data), self.n_bands), dtype=dtype)
+        elif (out.shape != (len(chunk_data), self.n_bands) or not out.flags.c_contiguous
+              or out.dtype not in (np.float32, np.float64)):
+            raise ValueError(f"out must be a C-contiguous float32/float64 array of shape "
+                             f"{(len(chunk_data), self.n_bands)}")
         
-        for i, band in enumerate(self.filters):
-            filtered_signal, new_zi = scipy.signal.sosfilt(
-                band['sos'], 
-                chunk_data, 
-                zi=band['zi']
-            )
-            band['zi'] = new_zi
-            output[:, i] = filtered_signal
-            
-        return output
\ No newline at end of file
+        x = np.ascontiguousarray(chunk_data, dtype=out.dtype)
+        sosfilt_bank(self.sos_stack, self.zi_stack, x, out)
+        return out
+
+    def mean_square(self, chunk_data):
+        """
+        Filters a chunk through the bank like process_chunk (same state update)
+        but returns only the mean square of each band, shape (n_bands,).
+        The band signals are never materialized.
+        """
+        x = np.ascontiguousarray(chunk_data, dtype=np.float32 if chunk_data.dtype == np.float32 else np.float64)
+        out = np.empty((1, self.n_bands))
+        self.mean_square_blocks(x[None, :], out)
+        return out[0]
+
+    def mean_square_blocks(self, blocks, out):
+        """
+        mean_square for each row of the C-contiguous 2D array blocks in turn,
+        in one kernel call; row j's band mean squares are written to out[j].
+        Short blocks then pay one parallel kernel launch per group of rows,
+        not one each.
+        """
+        sosfilt_bank_sumsq(self.sos_stack, self.zi_stack, blocks, out)
+        out /= max(blocks.shape[1], 1)
@@ -0,0 +1,219 @@
+# python2/vslm/filters/sos_kernels.py
+import numba
+import numpy as np
+from numba import float32, float64, int64, types, void
+
+# Designed coefficients are shared from a cache as read-only arrays
+_SOS_RO = types.Array(float64, 2, 'C', readonly=True)
+_SOS_STACK_RO = types.Array(float64, 3, 'C', readonly=True)
+
+# --- Compiled Biquad Kernels ---
+# Compiled on first use and cached on disk (cache=True), so later processes
+# load them without JIT warmup and recompile only after this file changes
+
+@numba.njit(
+    [(float64[:, ::1], float64[:, ::1], float64[::1]),
+     (_SOS_RO, float64[:, ::1], float64[::1])],
+    cache=True, fastmath=True, nogil=True
+)
+def sosfilt_df2t(sos, zi, x):
+    """
+    Filters x in place through a cascade of biquads (Direct-Form II Transposed).
+    Same recursion as scipy.signal.sosfilt; zi is updated in place so the next
+    call resumes where this one stopped.
+
+    Args:
+        sos (np.ndarray): (n_sections, 6) coefficients, a0 normalized to 1.
+        zi (np.ndarray): (n_sections, 2) filter state.
+        x (np.ndarray): Samples, overwritten with the filtered output.
+    """
+    n = x.shape[0]
+    for s in range(sos.shape[0]):
+        b0 = sos[s, 0]
+        b1 = sos[s, 1]
+        b2 = sos[s, 2]
+        a1 = sos[s, 4]
+        a2 = sos[s, 5]
+        z0 = zi[s, 0]
+        z1 = zi[s, 1]
+        for i in range(n):
+            xi = x[i]
+            y = b0 * xi + z0
+            z0 = b1 * xi - a1 * y + z1
+            z1 = b2 * xi - a2 * y
+            x[i] = y
+        zi[s, 0] = z0
+        zi[s, 1] = z1
+
+@numba.njit(
+    [float64(float64[:, ::1], float64[:, ::1], float64[::1]),
+     float64(_SOS_RO, float64[:, ::1], float64[::1])],
+    cache=True, fastmath=True, nogil=True
+)
+def sosfilt_df2t_sumsq(sos, zi, x):
+    """
+    Same as sosfilt_df2t, and also returns the sum of squares of the output.
+    The sum is accumulated inside the last section's loop, so the mean square
+    costs no extra pass over x.
+
+    Args:
+        sos (np.ndarray): (n_sections, 6) coefficients, a0 normalized to 1.
+        zi (np.ndarray): (n_sections, 2) filter state.
+        x (np.ndarray): Samples, overwritten with the filtered output.
+    """
+    n = x.shape[0]
+    last = sos.shape[0] - 1
+    acc = 0.0
+    for s in range(sos.shape[0]):
+        b0 = sos[s, 0]
+        b1 = sos[s, 1]
+        b2 = sos[s, 2]
+        a1 = sos[s, 4]
+        a2 = sos[s, 5]
+        z0 = zi[s, 0]
+        z1 = zi[s, 1]
+        if s == last:
+            for i in range(n):
+                xi = x[i]
+                y = b0 * xi + z0
+                z0 = b1 * xi - a1 * y + z1
+                z1 = b2 * xi - a2 * y
+                x[i] = y
+                acc += y * y
+        else:
+            for i in range(n):
+                xi = x[i]
+                y = b0 * xi + z0
+                z0 = b1 * xi - a1 * y + z1
+                z1 = b2 * xi - a2 * y
+                x[i] = y
+        zi[s, 0] = z0
+        zi[s, 1] = z1
+    return acc
+
+# Bands filtered in lock-step by one thread. A single cascade is bound by the
+# latency of its recursion; interleaving independent bands fills those stalls.
+_LANES = 4
+
+@numba.njit(
+    [void(sos_t, float64[:, :, ::1], int64, float64[:, ::1])
+     for sos_t in (float64[:, :, ::1], _SOS_STACK_RO)],
+    cache=True, fastmath=True, nogil=True
+)
+def _sosfilt_df2t_lanes(sos_stack, zi_stack, lo, y):
+    """
+    Runs bands lo .. lo+3 of a bank through sosfilt_df2t's recursion at the
+    same time, one band per column of y. Columns past the last band run with
+    zero coefficients and their state is discarded.
+
+    Args:
+        sos_stack (np.ndarray): (n_bands, n_sections, 6) coefficients.
+        zi_stack (np.ndarray): (n_bands, n_sections, 2) state, updated in place.
+        lo (int): First band of the group.
+        y (np.ndarray): (n_samples, 4) input, overwritten with the band outputs.
+    """
+    n = y.shape[0]
+    w = min(_LANES, sos_stack.shape[0] - lo)
+    c = np.zeros((_LANES, 6))
+    z = np.zeros((_LANES, 2))
+    for s in range(sos_stack.shape[1]):
+        for k in range(w):
+            c[k] = sos_stack[lo + k, s]
+            z[k] = zi_stack[lo + k, s]
+        b00, b10, b20, a10, a20 = c[0, 0], c[0, 1], c[0, 2], c[0, 4], c[0, 5]
+        b01, b11, b21, a11, a21 = c[1, 0], c[1, 1], c[1, 2], c[1, 4], c[1, 5]
+        b02, b12, b22, a12, a22 = c[2, 0], c[2, 1], c[2, 2], c[2, 4], c[2, 5]
+        b03, b13, b23, a13, a23 = c[3, 0], c[3, 1], c[3, 2], c[3, 4], c[3, 5]
+        p0, q0, p1, q1 = z[0, 0], z[0, 1], z[1, 0], z[1, 1]
+        p2, q2, p3, q3 = z[2, 0], z[2, 1], z[3, 0], z[3, 1]
+        for i in range(n):
+            x0 = y[i, 0]
+            x1 = y[i, 1]
+            x2 = y[i, 2]
+            x3 = y[i, 3]
+            y0 = b00 * x0 + p0
+            y1 = b01 * x1 + p1
+            y2 = b02 * x2 + p2
+            y3 = b03 * x3 + p3
+            p0 = b10 * x0 - a10 * y0 + q0
+            p1 = b11 * x1 - a11 * y1 + q1
+            p2 = b12 * x2 - a12 * y2 + q2
+            p3 = b13 * x3 - a13 * y3 + q3
+            q0 = b20 * x0 - a20 * y0
+            q1 = b21 * x1 - a21 * y1
+            q2 = b22 * x2 - a22 * y2
+            q3 = b23 * x3 - a23 * y3
+            y[i, 0] = y0
+            y[i, 1] = y1
+            y[i, 2] = y2
+            y[i, 3] = y3
+        z[0, 0], z[0, 1], z[1, 0], z[1, 1] = p0, q0, p1, q1
+        z[2, 0], z[2, 1], z[3, 0], z[3, 1] = p2, q2, p3, q3
+        for k in range(w):
+            zi_stack[lo + k, s] = z[k]
+
+@numba.njit(
+    [(sos_t, float64[:, :, ::1], x_t[::1], x_t[:, ::1])
+     for sos_t in (float64[:, :, ::1], _SOS_STACK_RO)
+     for x_t in (float64, float32)],
+    cache=True, fastmath=True, parallel=True
+)
+def sosfilt_bank(sos_stack, zi_stack, x, out):
+    """
+    Filters the same input through a bank of independent biquad cascades.
+    Groups of _LANES bands are spread across threads (see _sosfilt_df2t_lanes);
+    each band keeps its own zi row.
+    float32 input/output is supported; the recursion itself always runs in
+    float64 so high-order low-frequency bands stay stable.
+
+    Args:
+        sos_stack (np.ndarray): (n_bands, n_sections, 6) coefficients.
+        zi_stack (np.ndarray): (n_bands, n_sections, 2) state, updated in place.
+        x (np.ndarray): (n_samples,) input, left untouched.
+        out (np.ndarray): (n_samples, n_bands) output matrix, same dtype as x.
+    """
+    n = x.shape[0]
+    n_bands = sos_stack.shape[0]
+    for g in numba.prange((n_bands + _LANES - 1) // _LANES):
+        lo = g * _LANES
+        y = np.empty((n, _LANES))
+        for i in range(n):
+            y[i, :] = x[i]
+        _sosfilt_df2t_lanes(sos_stack, zi_stack, lo, y)
+        for k in range(min(_LANES, n_bands - lo)):
+            for i in range(n):
+                out[i, lo + k] = y[i, k]
+
+@numba.njit(
+    [(sos_t, float64[:, :, ::1], x_t[:, ::1], float64[:, :])
+     for sos_t in (float64[:, :, ::1], _SOS_STACK_RO)
+     for x_t in (float64, float32)],
+    cache=True, fastmath=True, parallel=True
+)
+def sosfilt_bank_sumsq(sos_stack, zi_stack, x, sumsq):
+    """
+    Same filtering and state update as sosfilt_bank, but only the sum of
+    squares of each band's output is kept, so no output matrix is needed.
+    Each row of x is a block; rows are filtered in turn with the state
+    carried from one to the next, as if each were a separate call.
+
+    Args:
+        sos_stack (np.ndarray): (n_bands, n_sections, 6) coefficients.
+        zi_stack (np.ndarray): (n_bands, n_sections, 2) state, updated in place.
+        x (np.ndarray): (n_blocks, n_samples) input, left untouched.
+        sumsq (np.ndarray): (n_blocks, n_bands) output, sum of y**2 per block and band.
+    """
+    n = x.shape[1]
+    n_bands = sos_stack.shape[0]
+    for g in numba.prange((n_bands + _LANES - 1) // _LANES):
+        lo = g * _LANES
+        y = np.empty((n, _LANES))
+        for j in range(x.shape[0]):
+            for i in range(n):
+                y[i, :] = x[j, i]
+            _sosfilt_df2t_lanes(sos_stack, zi_stack, lo, y)
+            for k in range(min(_LANES, n_bands - lo)):
+                acc = 0.0
+                for i in range(n):
+                    acc += y[i, k] * y[i, k]
+                sumsq[j, lo + k] = acc
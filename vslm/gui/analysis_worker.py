@@ -1,15 +1,29 @@
 # ... (Imports unchanged) ...
-from PySide6.QtCore import QThread, Signal
+import sys
+import threading
+import time
+import numpy as np
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
 from contextlib import closing
-import traceback
-from ..analysis_engine import StreamProcessor
 
-class AnalysisWorker(QThread):
+# Minimum time between progress updates (about one display frame), so the
+# GUI thread is woken at a bounded rate however short the blocks are
+_PROGRESS_INTERVAL_S = 0.033
+
+class AnalysisWorker(QObject, QRunnable):
+    """
+    One analysis run, executed on the global QThreadPool so repeated runs
+    reuse pooled threads instead of creating and joining one each.
+    start/isRunning/stop/wait mirror the QThread calls the controller makes.
+    """
     # ... (Signals unchanged) ...
     sig_progress = Signal(int)
     sig_total_blocks = Signal(int)
-    sig_finished = Signal(list)
-    sig_error = Signal(str)
+    # Level modes emit a columnar results table (see run), PSD/spectrogram
+    # their result dict; either way one reference, no per-item conversion
+    sig_finished = Signal(object)
+    # sys.exc_info() of the failure; the receiver formats it on its own thread
+    sig_error = Signal(object)
 
     def __init__(self, filepath, cal_factor, block_size_ms, weighting, 
                  do_bands, band_res, speed, band_order, ref_pressure,
@@ -17,7 +31,10 @@ class AnalysisWorker(QThread):
                  mode_is_psd=False, psd_nfft=4096, psd_window='Hanning',
                  # Spectrogram Params
                  mode_is_spec=False, spec_nfft=512, spec_dt=1.0, spec_window='Hamming'): # <--- Added spec_window
-        super().__init__()
+        QObject.__init__(self)
+        QRunnable.__init__(self)
+        # Python owns this object and its signals; the pool must not delete it
+        self.setAutoDelete(False)
         self.filepath = filepath
         self.cal_factor = cal_factor
         self.block_size_ms = block_size_ms
@@ -38,14 +55,58 @@ class AnalysisWorker(QThread):
         self.spec_window = spec_window # <--- Store it
         
         self._is_running = True
+        # Set while idle; cleared from start() until run() returns
+        self._done = threading.Event()
+        self._done.set()
+        self._last_progress = 0.0
+        self._processor = None
+        self._total_blocks = 0
+
+    def start(self):
+        """
+        Opens the file and queues the run. Returns False (after emitting
+        sig_error) if the file cannot be opened; nothing is queued then.
+        """
+        # Load the engine here, on the calling (GUI) thread: its kernels start
+        # numba's TBB pool on import, and a pool first started from a worker
+        # thread hangs interpreter exit
+        from ..analysis_engine import StreamProcessor
+        # Probing the file header is cheap, so it happens here too: a bad file
+        # is reported before anything is queued, and the progress range is set
+        # before run() reaches its first block
+        try:
+            self._processor = StreamProcessor(self.filepath, self.cal_factor)
+        except Exception:
+            self.sig_error.emit(sys.exc_info())
+            return False
+        if self.mode_is_spec or self.mode_is_psd:
+            self._total_blocks = 100
+        else:
+            self._total_blocks = self._processor.n_blocks(self.block_size_ms)
+        self.sig_total_blocks.emit(self._total_blocks)
+        self._done.clear()
+        QThreadPool.globalInstance().start(self)
+        return True
+
+    def isRunning(self):
+        return not self._done.is_set()
+
+    def wait(self):
+        self._done.wait()
+
+    def _emit_progress(self, value):
+        now = time.monotonic()
+        if now - self._last_progress >= _PROGRESS_INTERVAL_S:
+            self._last_progress = now
+            self.sig_progress.emit(value)
 
     def run(self):
         try:
-            processor = StreamProcessor(self.filepath, self.cal_factor)
+            # Opened in start(), on the GUI thread
+            processor = self._processor
             
             if self.mode_is_spec:
                 # --- SPECTROGRAM PATH ---
-                self.sig_total_blocks.emit(100)
                 gen = processor.calculate_spectrogram(
                     nfft=self.spec_nfft,
                     dt=self.spec_dt,
@@ -56,7 +117,6 @@ class AnalysisWorker(QThread):
 
             elif self.mode_is_psd:
                 # ... (PSD Logic unchanged) ...
-                self.sig_total_blocks.emit(100) 
                 gen = processor.calculate_psd(
                     nfft=self.psd_nfft,
                     window_type=self.psd_window,
@@ -66,40 +126,60 @@ class AnalysisWorker(QThread):
 
             else:
                 # ... (Standard Logic unchanged) ...
-                total_blocks = int((processor.duration * 1000) / self.block_size_ms)
-                self.sig_total_blocks.emit(total_blocks)
-                results = []
-                gen = processor.run_analysis(
+                total_blocks = self._total_blocks
+                gen = processor.run_analysis_batched(
                     block_size_ms=self.block_size_ms,
                     weighting=self.weighting,
                     do_band_analysis=self.do_bands,
                     band_resolution=self.band_res,
                     time_weighting=self.speed,
                     band_order=self.band_order,
-                    ref_pressure=self.ref_pressure
+                    ref_pressure=self.ref_pressure,
+                    batch=64
                 )
+                # One array per quantity, allocated once and filled a batch at
+                # a time: 'time', 'leq', 'lp' are (n_blocks,), 'bands' (n_blocks, n_bands).
+                # Levels are kept as float32 (far finer than 0.01 dB, half the
+                # memory on long recordings); times stay float64 so they do not
+                # lose resolution over hours
+                results = {}
+                i = 0
                 with closing(gen):
-                    for i, block in enumerate(gen):
+                    for cols in gen:
                         if not self._is_running: break
-                        results.append(block)
-                        if i % 10 == 0: self.sig_progress.emit(i + 1)
+                        if not results:
+                            # The first batch fixes the columns (and the band count)
+                            results = {key: np.empty((total_blocks,) + col.shape[1:],
+                                                     dtype=np.float64 if key == 'time' else np.float32)
+                                       for key, col in cols.items() if key != 'band_freqs'}
+                        n = len(cols['time'])
+                        for key, col in results.items():
+                            col[i:i + n] = cols[key]
+                        i += n
+                        self._emit_progress(i)
                 if self._is_running:
+                    if not results:
+                        results = {key: np.empty(0) for key in ('time', 'leq', 'lp')}
+                    elif 'bands' in results:
+                        results['band_freqs'] = cols['band_freqs']
                     self.sig_progress.emit(total_blocks)
                     self.sig_finished.emit(results)
-        except Exception as e:
-            error_msg = f"{str(e)}\n\nTraceback:\n{traceback.format_exc()}"
-            self.sig_error.emit(error_msg)
+        except Exception:
+            self.sig_error.emit(sys.exc_info())
+        finally:
+            self._done.set()
 
     def _run_generator(self, gen):
+        from ..analysis_engine import PROGRESS
         final_result = None
         with closing(gen):
-            for item in gen:
+            for kind, payload in gen:
                 if not self._is_running: break
-                if isinstance(item, int): self.sig_progress.emit(item)
-                elif isinstance(item, dict): final_result = item
+                if kind == PROGRESS: self._emit_progress(payload)
+                else: final_result = payload
         if self._is_running and final_result:
             self.sig_progress.emit(100)
-            self.sig_finished.emit([final_result])
+            self.sig_finished.emit(final_result)
 
     def stop(self):
         self._is_running = False
\ No newline at end of file
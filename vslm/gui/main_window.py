@@ -1,6 +1,5 @@
 import sys
 from pathlib import Path
-import soundfile as sf
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QPushButton, QLabel, QGroupBox, 
                                QFileDialog, QMessageBox, QFrame, QButtonGroup, 
@@ -9,9 +8,6 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
 from PySide6.QtGui import QAction, QDesktopServices, QIcon
 from PySide6.QtCore import QUrl, Slot
 
-from .waveform_dialog import WaveformDialog
-from .calibration_dialog import CalibrationDialog
-from .about_dialog import AboutDialog 
 from .plot_widget import MatplotlibWidget
 from .plot_manager import ResultPlotter
 from ..constants import LEQ_INTERVAL_MAP, AnalysisMode
@@ -332,8 +328,7 @@ class MainWindow(QMainWindow):
             settings.plot_ymax
         )
         if self.controller.filepath:
-            from soundfile import info
-            self.on_file_loaded_update_ui(self.controller.filepath, info(str(self.controller.filepath)))
+            self.on_file_loaded_update_ui(self.controller.filepath, self.controller.file_info)
         else:
             self.on_file_loaded_update_ui(None, None)
 
@@ -391,6 +386,9 @@ class MainWindow(QMainWindow):
     def on_select_section(self):
         if not self.controller.filepath: return
         
+        # Dialogs are imported when first opened; the waveform view pulls in
+        # pyqtgraph, which most sessions never need
+        from .waveform_dialog import WaveformDialog
         dlg = WaveformDialog(str(self.controller.filepath), self)
         if self.controller.end_time:
              dlg.viewer.region.setRegion([self.controller.start_time, self.controller.end_time])
@@ -403,6 +401,7 @@ class MainWindow(QMainWindow):
     def on_calibrate(self):
         if not self.controller.filepath: return
         
+        from .calibration_dialog import CalibrationDialog
         dlg = CalibrationDialog(
             self.controller.cal_factor, 
             self.controller.filepath, 
@@ -465,6 +464,7 @@ class MainWindow(QMainWindow):
         QDesktopServices.openUrl(QUrl(url))
 
     def on_about(self):
+        from .about_dialog import AboutDialog
         AboutDialog(self).exec()
 
     @Slot(object, object)
@@ -485,12 +485,9 @@ class MainWindow(QMainWindow):
         dur_str = ""
         
         if self.controller.filepath:
-            # Attempt to re-read info if not provided (e.g. after cal dialog)
+            # Fall back to the info cached at load if not provided (e.g. after cal dialog)
             if info is None:
-                try:
-                    info = sf.info(str(self.controller.filepath))
-                except Exception:
-                    pass
+                info = self.controller.file_info
             
             if info:
                 fs_str = f"{info.samplerate} Hz"
@@ -513,7 +510,7 @@ class MainWindow(QMainWindow):
         # Note: We do NOT setMaximum here anymore because we wait for sig_total_blocks
         self.update_status_bar(f"Analyzing ({speed_str})...")
 
-    @Slot(list)
+    @Slot(object)
     def on_analysis_finished_ui(self, results):
         self.toggle_inputs(True)
         self.btn_analyze.setText("ANALYZE")
@@ -548,7 +545,10 @@ class MainWindow(QMainWindow):
         self.btn_cal.setEnabled(enabled) 
         self.combo_leq_int.setEnabled(enabled)
         
-        can_export = (len(self.controller.last_results) > 0)
+        # PSD/spectrogram results are one dict with a 'type'; a level table
+        # can be exportable only if the analysis range selected any blocks
+        results = self.controller.last_results
+        can_export = 'type' in results or len(results.get('time', ())) > 0
         self.menu_export.setEnabled(enabled and can_export)
         
         for child in self.left_panel.findChildren(QGroupBox):
@@ -7,7 +7,7 @@ from ..constants import LEQ_INTERVAL_MAP
 class ResultPlotter:
     @staticmethod
     def plot(figure: Figure, 
-             results: list, 
+             results: dict, 
              mode_id: int, 
              weighting: str, 
              speed: str, 
@@ -21,7 +21,8 @@ class ResultPlotter:
         
         figure.clear()
         
-        if not results:
+        # Level modes pass a columnar table, PSD/spectrogram their result dict
+        if not results or ('time' in results and len(results['time']) == 0):
             ax = figure.add_subplot(111)
             ax.text(0.5, 0.5, "No Data", ha='center', va='center')
             return
@@ -47,12 +48,12 @@ class ResultPlotter:
                     )
                 case 4: # PSD
                     ResultPlotter._plot_psd(
-                        figure, results[0], ref_pressure, 
+                        figure, results, ref_pressure, 
                         autoscale, ymin, ymax
                     )
                 case 5: # Spectrogram
                     ResultPlotter._plot_spectrogram(
-                        figure, results[0], ref_pressure, autoscale, ymin, ymax, spec_cmap
+                        figure, results, ref_pressure, autoscale, ymin, ymax, spec_cmap
                     )
         except Exception as e:
             ax = figure.add_subplot(111)
@@ -93,8 +94,8 @@ class ResultPlotter:
     @staticmethod
     def _plot_lp_history(fig, results, weighting, speed, autoscale, ymin, ymax):
         ax = fig.add_subplot(1, 1, 1)
-        t = [r.get('time', 0) for r in results]
-        l = [r.get('lp', -300) for r in results] 
+        t = results['time']
+        l = results['lp']
         ax.plot(t, l)
         ax.set_title(f"Sound Pressure Level vs Time ({weighting}-weighted, {speed})")
         ax.set_xlabel("Time (s)")
@@ -102,23 +103,16 @@ class ResultPlotter:
         ax.grid(True)
         if not autoscale: ax.set_ylim(ymin, ymax)
         else:
-            if l and max(l) < 0: ax.set_ylim(-100, 100)
+            if len(l) and np.max(l) < 0: ax.set_ylim(-100, 100)
             else: ax.autoscale(axis='y')
 
     @staticmethod
     def _plot_spectrum(fig, results, weighting, is_third_octave, ref_pressure, 
                        autoscale, ymin, ymax):
         ax = fig.add_subplot(1, 1, 1)
-        last_res = results[-1]
-        freqs = last_res.get('band_freqs', [])
-        if 'bands' in results[0]:
-            energy_sums = np.zeros(len(freqs))
-            count = 0
-            for r in results:
-                if 'bands' in r:
-                    pressures = (10**(r['bands']/10.0)) * (ref_pressure**2); energy_sums += pressures; count += 1
-            if count > 0: mean_db = 10 * np.log10((energy_sums / count) / (ref_pressure**2) + 1e-30)
-            else: mean_db = np.zeros(len(freqs))
+        freqs = results.get('band_freqs', [])
+        if 'bands' in results:
+            mean_db = leq_calculator.energy_mean_db(results['bands'], axis=0)
         else: mean_db = []
         if len(freqs) > 0:
             x = np.arange(len(freqs)); ax.bar(x, mean_db, color='#2ca02c', alpha=0.8); ax.set_xticks(x)
@@ -135,6 +129,8 @@ class ResultPlotter:
     def _plot_psd(fig, data, ref_pressure, autoscale, ymin, ymax):
         ax = fig.add_subplot(1, 1, 1)
         freqs = data['freqs']; pxx = data['pxx']; nfft = data['nfft']; window = data['window']; weighting = data.get('weighting', 'Z')
+        # Drop the DC bin up front: it has no place on a log frequency axis
+        freqs = freqs[1:]; pxx = pxx[1:]
         lpxx = 10 * np.log10(pxx / (ref_pressure**2) + 1e-30)
         lp_max = np.max(lpxx); lpxx_clamped = np.maximum(lpxx, lp_max - 60)
         ax.semilogx(freqs, lpxx_clamped)
@@ -142,7 +138,7 @@ class ResultPlotter:
         ax.set_xlabel("Frequency (Hz)")
         ax.set_ylabel("Pxx (dB/Hz)")
         ax.grid(True, which="both", ls="-", alpha=0.5)
-        ax.set_xlim(left=freqs[1]) 
+        ax.set_xlim(left=freqs[0]) 
         if not autoscale: ax.set_ylim(ymin, ymax)
         else: ax.autoscale(axis='y')
 
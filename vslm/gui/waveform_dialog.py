@@ -61,42 +61,46 @@ class WaveformViewer(QWidget):
         # Calculate step size to achieve target points
         step = max(1, total_frames // target_points)
         
-        # Arrays to hold the envelope
-        mins = []
-        maxs = []
-        
-        # Read and decimate
-        # Using blocks keeps RAM usage low during load
+        # Envelope points are filled in place; their count is known up front
+        num_points = total_frames // step
+        self.min_envelope = np.empty(num_points, dtype=np.float32)
+        self.max_envelope = np.empty(num_points, dtype=np.float32)
+        
+        # Stream fixed blocks of 10 steps through one reused float32 buffer, so
+        # RAM stays at one block no matter how long the file is
+        block_frames = step * 10
         with sf.SoundFile(filepath) as f:
-            while f.tell() < total_frames:
-                # Read a chunk (e.g., 10 steps worth)
-                chunk_frames = step * 10
-                data = f.read(chunk_frames, always_2d=True)
+            buf = np.empty((block_frames, f.channels), dtype=np.float32)
+            mono = np.empty(block_frames, dtype=np.float32)
+            # Channel mean as a matrix-vector product, like the analysis reader:
+            # np.mean(axis=1) over the short channel axis is far slower
+            weights = np.full(f.channels, 1.0 / f.channels, dtype=np.float32)
+            pos = 0
+            while pos < num_points:
+                # Returns the filled leading rows of buf (short at end of file)
+                data = f.read(out=buf)
+                n = len(data)
+                if n == 0:
+                    break
                 
                 # If stereo, mix to mono for visualization
-                if data.shape[1] > 1:
-                    data = np.mean(data, axis=1)
-                else:
-                    data = data.flatten()
-                
-                # Compute min/max for each 'step' in this chunk
-                # Reshape to (-1, step) to vectorize the min/max calc
-                # Handle edge case where data len isn't multiple of step
-                trim = len(data) % step
-                if trim > 0:
-                    data = data[:-trim]
+                np.matmul(data, weights, out=mono[:n])
                 
-                if len(data) > 0:
-                    reshaped = data.reshape(-1, step)
-                    mins.append(np.min(reshaped, axis=1))
-                    maxs.append(np.max(reshaped, axis=1))
-        
-        self.min_envelope = np.concatenate(mins)
-        self.max_envelope = np.concatenate(maxs)
-        
-        # Time axis
-        num_points = len(self.min_envelope)
-        self.time_axis = np.linspace(0, self.duration, num_points)
+                # Min/max for each whole 'step' in this block; a partial
+                # trailing step is dropped
+                n_steps = min(n // step, num_points - pos)
+                if n_steps == 0:
+                    break
+                reshaped = mono[:n_steps * step].reshape(n_steps, step)
+                np.min(reshaped, axis=1, out=self.min_envelope[pos:pos + n_steps])
+                np.max(reshaped, axis=1, out=self.max_envelope[pos:pos + n_steps])
+                pos += n_steps
+        
+        self.min_envelope = self.min_envelope[:pos]
+        self.max_envelope = self.max_envelope[:pos]
+        
+        # Time axis: each envelope point starts one step of samples later
+        self.time_axis = np.arange(pos, dtype=np.float64) * (step / fs)
         
         # Update Plot
         self.curve_min.setData(self.time_axis, self.min_envelope)
@@ -1,10 +1,25 @@
 import numpy as np
+from scipy.special import logsumexp
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Dict, List, Union
 
 if TYPE_CHECKING:
     from .settings_manager import DoseStandard
 
+# Statistical levels reported as Ln (level exceeded n% of the time)
+LN_PERCENTS = (10, 20, 30, 40, 50, 60, 70, 80, 90)
+
+# Natural-log units per dB: 10**(L/10) == exp(L * _DB_TO_NEPER)
+_DB_TO_NEPER = np.log(10.0) / 10.0
+
+def energy_mean_db(levels_db, axis=None):
+    """
+    Energy average of dB levels, 10*log10(mean(10**(L/10))), evaluated in the
+    log domain so loud or long records neither overflow nor lose precision.
+    """
+    n = levels_db.size if axis is None else levels_db.shape[axis]
+    return logsumexp(levels_db * _DB_TO_NEPER, axis=axis) / _DB_TO_NEPER - 10 * np.log10(n)
+
 @dataclass
 class LeqStats:
     overall: float
@@ -15,40 +30,44 @@ class LeqStats:
     history: Dict[str, List[float]]
     stats_block_size_ms: float
 
-def calculate_leq_analysis(block_results: list, 
+def calculate_leq_analysis(block_results: Union[list, Dict[str, np.ndarray]], 
                            stats_block_ms: float, 
                            integration_time_s: float, 
                            dose_params: "DoseStandard", 
                            ref_pressure: float = 20e-6) -> LeqStats:
     """
     Performs full LEQ analysis using configurable physics/dose parameters.
+    
+    block_results is either a list of per-block dicts, or a columnar dict
+    whose 'leq' entry holds all block levels as one array (fast path).
+    Levels are averaged directly in dB, so ref_pressure cancels out; it is
+    kept for API compatibility.
     """
-    if not block_results:
+    # Extract LEQ values
+    if isinstance(block_results, dict):
+        raw_db = np.asarray(block_results.get('leq', []), dtype=float)
+    else:
+        raw_db = np.array([b.get('leq', -100.0) for b in block_results])
+
+    if raw_db.size == 0:
         return LeqStats(
             overall=-100.0, max=-100.0, min=-100.0, 
-            ln={n: -100.0 for n in [10, 20, 30, 40, 50, 60, 70, 80, 90]},
+            ln={n: -100.0 for n in LN_PERCENTS},
             dose={'dose': 0.0, 'twa': 0.0},
             history={'time': [], 'leq': []},
             stats_block_size_ms=stats_block_ms
         )
 
-    # Extract LEQ values
-    raw_db = np.array([b.get('leq', -100.0) for b in block_results])
-    
     # Calculate Energy Average (Overall LEQ)
-    raw_pressure_sq = (10**(raw_db/10.0)) * (ref_pressure**2)
-    overall_msq = np.mean(raw_pressure_sq)
-    overall_leq = 10 * np.log10(overall_msq / (ref_pressure**2) + 1e-30)
+    overall_leq = energy_mean_db(raw_db)
     
     # Min / Max
     l_max = np.max(raw_db)
     l_min = np.min(raw_db)
     
-    # Percentiles (Ln)
-    percentiles = {
-        n: np.percentile(raw_db, 100 - n) 
-        for n in [10, 20, 30, 40, 50, 60, 70, 80, 90]
-    }
+    # Percentiles (Ln): one partition pass over all order statistics at once
+    ln_values = np.percentile(raw_db, [100 - n for n in LN_PERCENTS])
+    percentiles = {n: float(v) for n, v in zip(LN_PERCENTS, ln_values)}
         
     # --- FIX: Use Attribute Access for Pydantic Object ---
     # dose_params is an object, not a dictionary.
@@ -107,14 +126,13 @@ def calculate_leq_analysis(block_results: list,
     if blocks_per_interval < 1: 
         blocks_per_interval = 1
         
-    n_total = len(raw_pressure_sq)
+    n_total = len(raw_db)
     n_intervals = n_total // blocks_per_interval
     
     if n_intervals > 0:
-        trimmed_sq = raw_pressure_sq[:n_intervals*blocks_per_interval]
-        reshaped = trimmed_sq.reshape(n_intervals, blocks_per_interval)
-        means = np.mean(reshaped, axis=1)
-        agg_leq = 10 * np.log10(means / (ref_pressure**2) + 1e-30)
+        trimmed_db = raw_db[:n_intervals*blocks_per_interval]
+        reshaped = trimmed_db.reshape(n_intervals, blocks_per_interval)
+        agg_leq = energy_mean_db(reshaped, axis=1)
         agg_time = np.arange(n_intervals) * integration_time_s
     else:
         agg_leq = np.array([])
@@ -1,6 +1,5 @@
 import csv
 from pathlib import Path
-import numpy as np
 from . import leq_calculator
 from .constants import LEQ_INTERVAL_MAP # New Import
 
@@ -10,18 +9,17 @@ class ResultsExporter:
     """
     
     @staticmethod
-    def export_lp(filepath: Path, results: list, weighting: str, speed: str):
-        """Exports raw Time vs Lp history."""
+    def export_lp(filepath: Path, results: dict, weighting: str, speed: str):
+        """Exports raw Time vs Lp history from a columnar results table."""
         with open(filepath, 'w', newline='') as f:
             writer = csv.writer(f)
             header = ["Time (s)", f"Lp ({weighting}, {speed}) [dB]"]
             writer.writerow(header)
             
-            for r in results:
-                writer.writerow([f"{r['time']:.3f}", f"{r['lp']:.2f}"])
+            writer.writerows([f"{t:.3f}", f"{l:.2f}"] for t, l in zip(results['time'], results['lp']))
 
     @staticmethod
-    def export_leq(filepath: Path, results: list, block_size_ms: float, 
+    def export_leq(filepath: Path, results: dict, block_size_ms: float, 
                    interval_key, # Expects Enum or Key 
                    weighting: str,
                    dose_params: dict, ref_pressure: float): 
@@ -33,7 +31,8 @@ class ResultsExporter:
         else:
             interval_txt, interval_sec = "1 sec", 1.0
 
-        stats = leq.calculate_leq_analysis(
+        # The columnar table takes the array fast path in the LEQ analysis
+        stats = leq_calculator.calculate_leq_analysis(
             results, block_size_ms, interval_sec, dose_params, ref_pressure
         )
         
@@ -49,26 +48,14 @@ class ResultsExporter:
                 writer.writerow([f"{t:.2f}", f"{l:.2f}"])
 
     @staticmethod
-    def export_spectrum(filepath: Path, results: list, weighting: str, ref_pressure: float):
+    def export_spectrum(filepath: Path, results: dict, weighting: str, ref_pressure: float):
         """Exports the time-averaged spectrum."""
-        if not results: return
-        
-        if 'bands' not in results[0]:
+        if 'bands' not in results or len(results['bands']) == 0:
             return
 
-        freqs = results[0]['band_freqs']
-        
-        energy_sums = np.zeros(len(freqs))
-        count = len(results)
-        for r in results:
-            pressures = (10**(r['bands']/10.0)) * (ref_pressure**2)
-            energy_sums += pressures
+        freqs = results['band_freqs']
         
-        if count > 0:
-            mean_pressure_sq = energy_sums / count
-            mean_db = 10 * np.log10(mean_pressure_sq / (ref_pressure**2) + 1e-30)
-        else:
-            mean_db = np.zeros(len(freqs))
+        mean_db = leq_calculator.energy_mean_db(results['bands'], axis=0)
             
         with open(filepath, 'w', newline='') as f:
             writer = csv.writer(f)